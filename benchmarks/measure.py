@@ -0,0 +1,86 @@
+import math
+from time import perf_counter
+
+from django.db import connection
+
+RESULT_FIELDS = ('p50_ms', 'p90_ms', 'p99_ms', 'mean_ms',
+                 'queries', 'sql_ms')
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts queries and sums their run time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += perf_counter() - started
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(timings, queries, sql_seconds):
+    to_ms = 1000
+    return {
+        'p50_ms': round(percentile(timings, 0.50) * to_ms, 3),
+        'p90_ms': round(percentile(timings, 0.90) * to_ms, 3),
+        'p99_ms': round(percentile(timings, 0.99) * to_ms, 3),
+        'mean_ms': round(sum(timings) / len(timings) * to_ms, 3),
+        'queries': max(queries),
+        'sql_ms': round(sum(sql_seconds) / len(sql_seconds) * to_ms, 3),
+    }
+
+
+def measure(client, scenario, repeat, warmup=3, before_request=None):
+    scenario.prepare(client)
+    for _ in range(warmup):
+        scenario.run(client)
+    timings, queries, sql_seconds = [], [], []
+    for _ in range(repeat):
+        if before_request:
+            before_request()
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = perf_counter()
+            scenario.run(client)
+            timings.append(perf_counter() - started)
+        queries.append(timer.count)
+        sql_seconds.append(timer.seconds)
+    return summarize(timings, queries, sql_seconds)
+
+
+def compare(baseline, current, threshold):
+    """Return ``(view, message)`` for every view slower than ``baseline``.
+
+    Latency regresses when the median grows by more than ``threshold``
+    (a fraction); the query count regresses on any increase.
+    """
+    regressions = []
+    for view, before in baseline.items():
+        after = current.get(view)
+        if after is None:
+            regressions.append((view, 'нет в текущем замере'))
+            continue
+        limit = before['p50_ms'] * (1 + threshold)
+        if after['p50_ms'] > limit:
+            regressions.append((
+                view,
+                f'p50 {after["p50_ms"]} мс > {limit:.3f} мс '
+                f'(было {before["p50_ms"]} мс)'
+            ))
+        if after['queries'] > before['queries']:
+            regressions.append((
+                view,
+                f'запросов {after["queries"]} > {before["queries"]}'
+            ))
+    return regressions
@@ -0,0 +1,134 @@
+"""Benchmark the blog views on a seeded throwaway database.
+
+    python -m benchmarks --posts 5000 --output baseline.json
+    python -m benchmarks --posts 5000 --compare baseline.json
+
+``--compare`` exits with status 1 when a view regresses.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import django
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=30,
+                        help='Измерений на каждый view.')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cold', action='store_true',
+                        help='Очищать кеш перед каждым запросом.')
+    parser.add_argument('--only', nargs='*',
+                        help='Замерить только перечисленные view.')
+    parser.add_argument('--output', type=Path,
+                        help='Записать результаты в JSON-файл.')
+    parser.add_argument('--compare', type=Path,
+                        help='Сравнить с сохранённым JSON-файлом.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустимый рост p50, доля от базового.')
+    return parser.parse_args(argv)
+
+
+def setup_django():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    django.setup()
+    logging.getLogger('blog.timing').disabled = True
+
+
+def run(args):
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test import Client
+
+    from .measure import measure
+    from .scenarios import build_scenarios
+
+    call_command('seed_blog', users=args.users, posts=args.posts,
+                 comments=args.comments, seed=args.seed, stdout=StringIO())
+    cache.clear()
+    client = Client()
+    results = {}
+    for scenario in build_scenarios():
+        if args.only and scenario.name not in args.only:
+            continue
+        results[scenario.name] = measure(
+            client, scenario, args.repeat, args.warmup,
+            before_request=cache.clear if args.cold else None
+        )
+        print(f'{scenario.name:16} ' + '  '.join(
+            f'{field}={value}'
+            for field, value in results[scenario.name].items()
+        ))
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import (override_settings, setup_test_environment,
+                                   teardown_test_environment)
+
+    from .measure import compare
+
+    setup_test_environment(debug=False)
+    with TemporaryDirectory() as location, override_settings(CACHES={
+        'default': {**settings.CACHES['default'], 'LOCATION': location},
+    }):
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            views = run(args)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    report = {
+        'meta': {
+            'users': args.users, 'posts': args.posts,
+            'comments': args.comments, 'seed': args.seed,
+            'repeat': args.repeat, 'cold': args.cold,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'views': views,
+    }
+    if args.output:
+        args.output.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False) + '\n',
+            encoding='utf-8'
+        )
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        dataset = ('users', 'posts', 'comments', 'seed', 'cold')
+        if any(baseline['meta'].get(key) != report['meta'][key]
+               for key in dataset):
+            print('Внимание: базовый замер снят на другом наборе данных.')
+        baseline_views = baseline['views']
+        if args.only:
+            baseline_views = {
+                view: result for view, result in baseline_views.items()
+                if view in args.only
+            }
+        regressions = compare(baseline_views, views, args.threshold)
+        for view, message in regressions:
+            print(f'РЕГРЕССИЯ {view}: {message}')
+        if regressions:
+            return 1
+        print('Регрессий нет.')
+    return 0
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from blog.models import Commentary, Post
+
+User = get_user_model()
+
+
+class Scenario:
+    def __init__(self, name, url, data=None, user=None, status=200):
+        self.name = name
+        self.url = url
+        self.data = data
+        self.user = user
+        self.status = status
+
+    def prepare(self, client):
+        if self.user is not None:
+            client.force_login(self.user)
+        else:
+            client.logout()
+
+    def run(self, client):
+        if self.data is None:
+            response = client.get(self.url)
+        else:
+            response = client.post(self.url, self.data)
+        if response.status_code != self.status:
+            raise AssertionError(
+                f'{self.name}: {self.url} вернул {response.status_code}, '
+                f'ожидался {self.status}'
+            )
+        return response
+
+
+def build_scenarios():
+    """Views of the busiest post, its category and its author.
+
+    Write scenarios come last: each run adds or edits a comment.
+    """
+    post = Post.objects.visible_to().order_by(
+        '-comment_count', 'id'
+    ).first()
+    if post is None:
+        raise RuntimeError('В базе нет опубликованных постов.')
+    commenter = User.objects.exclude(pk=post.author_id).order_by(
+        'id'
+    ).first() or post.author
+    comment = Commentary.objects.create(
+        post=post, author=commenter, text='Комментарий для замеров'
+    )
+    return [
+        Scenario('homepage', reverse('blog:homepage')),
+        Scenario('category', reverse('blog:category_posts',
+                                     args=(post.category.slug,))),
+        Scenario('profile', reverse('blog:profile',
+                                    args=(post.author.username,))),
+        Scenario('detail', reverse('blog:post_detail', args=(post.pk,))),
+        Scenario('comment_create', reverse('blog:comment', args=(post.pk,)),
+                 data={'text': 'Новый комментарий'}, user=commenter,
+                 status=302),
+        Scenario('comment_edit', reverse('blog:edit_comment',
+                                         args=(post.pk, comment.pk)),
+                 data={'text': 'Исправленный комментарий'}, user=commenter,
+                 status=302),
+    ]
@@ -0,0 +1,153 @@
+"""Read-only JSON API, version 1.
+
+Every endpoint serves the public view of the blog: the same rows the
+homepage shows to an anonymous visitor, reduced to the fields listed in
+``POST_FIELDS``/``COMMENT_FIELDS``/``CATEGORY_FIELDS``.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, F, When
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from .cache import (FEED_SCOPE, POST_SCOPE, TAXONOMY_SCOPE,
+                    cache_anonymous_page)
+from .models import Category, Commentary, Post
+from .paginators import CommentPaginator, CursorPaginator
+from .views import COMMENTS_PER_PAGE, POSTS_PER_PAGE
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location_name',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+CATEGORY_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+EXPORT_CHUNK_SIZE = 500
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+
+class PostRowPaginator(CursorPaginator):
+    def cursor_values(self, row):
+        return row['pub_date'].isoformat(), row['id']
+
+
+class CommentRowPaginator(CommentPaginator):
+    def cursor_values(self, row):
+        return row['created_at'].isoformat(), row['id']
+
+
+def select(queryset, fields):
+    return queryset.values(*fields.values())
+
+
+def serialize(row, fields):
+    return {name: row[lookup] for name, lookup in fields.items()}
+
+
+def public_posts():
+    return Post.objects.visible_to().annotate(
+        location_name=Case(When(location_visible=True,
+                                then=F('location__name')))
+    )
+
+
+def not_found():
+    return JsonResponse({'detail': 'Не найдено.'}, status=404)
+
+
+def page_response(request, page, fields):
+    def link(cursor_name, cursor):
+        return cursor and request.build_absolute_uri(
+            f'{request.path}?{cursor_name}={cursor}'
+        )
+
+    return JsonResponse({
+        'results': [serialize(row, fields) for row in page],
+        'next': link('after', page.next_cursor),
+        'previous': link('before', page.previous_cursor),
+    })
+
+
+def stream_rows(rows, fields):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(serialize(row, fields)) + '\n'
+
+
+def ndjson_response(queryset, fields):
+    rows = select(queryset, fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return StreamingHttpResponse(
+        stream_rows(rows, fields), content_type=NDJSON_CONTENT_TYPE
+    )
+
+
+@require_safe
+@cache_anonymous_page(FEED_SCOPE, TAXONOMY_SCOPE)
+def post_list(request):
+    page = PostRowPaginator(
+        select(public_posts(), POST_FIELDS), POSTS_PER_PAGE
+    ).get_page(after=request.GET.get('after'),
+               before=request.GET.get('before'))
+    return page_response(request, page, POST_FIELDS)
+
+
+@require_safe
+@cache_anonymous_page(POST_SCOPE, TAXONOMY_SCOPE)
+def post_detail(request, post_id):
+    row = select(public_posts().filter(pk=post_id), POST_FIELDS).first()
+    if row is None:
+        return not_found()
+    return JsonResponse(serialize(row, POST_FIELDS))
+
+
+@require_safe
+@cache_anonymous_page(POST_SCOPE, TAXONOMY_SCOPE)
+def comment_list(request, post_id):
+    if not public_posts().filter(pk=post_id).exists():
+        return not_found()
+    page = CommentRowPaginator(
+        select(Commentary.objects.filter(post_id=post_id), COMMENT_FIELDS),
+        COMMENTS_PER_PAGE
+    ).get_page(after=request.GET.get('after'),
+               before=request.GET.get('before'))
+    return page_response(request, page, COMMENT_FIELDS)
+
+
+@require_safe
+@cache_anonymous_page(TAXONOMY_SCOPE)
+def category_list(request):
+    rows = select(
+        Category.objects.filter(is_published=True).order_by('title'),
+        CATEGORY_FIELDS
+    )
+    return JsonResponse(
+        {'results': [serialize(row, CATEGORY_FIELDS) for row in rows]}
+    )
+
+
+@require_safe
+def post_export(request):
+    return ndjson_response(public_posts(), POST_FIELDS)
+
+
+@require_safe
+def comment_export(request):
+    comments = Commentary.objects.filter(
+        post__in=public_posts().values('id')
+    ).order_by('created_at', 'id')
+    return ndjson_response(comments, COMMENT_FIELDS)
@@ -0,0 +1,232 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from . import metrics
+
+PAGE_PREFIX = 'blog:page'
+COUNT_PREFIX = 'blog:count'
+SCOPE_PREFIX = 'blog:scope'
+STATS_KEYS = {
+    'hits': 'blog:page_cache:hits',
+    'misses': 'blog:page_cache:misses',
+}
+
+FEED_SCOPE = 'feed'
+TAXONOMY_SCOPE = 'taxonomy'
+POST_SCOPE = 'post:{post_id}'
+CATEGORY_SCOPE = 'category:{category_slug}'
+PUBLISHED_SCOPE = 'published'
+SYNDICATION_SCOPE = 'syndication'
+SYNDICATION_CATEGORY_SCOPE = 'syndication:category:{category_slug}'
+SYNDICATION_AUTHOR_SCOPE = 'syndication:author:{username}'
+
+
+def post_scopes(post_id, *category_slugs):
+    scopes = [FEED_SCOPE, POST_SCOPE.format(post_id=post_id)]
+    scopes.extend(
+        CATEGORY_SCOPE.format(category_slug=slug)
+        for slug in category_slugs if slug
+    )
+    return scopes
+
+
+def syndication_scopes(username, *category_slugs):
+    scopes = [
+        SYNDICATION_SCOPE,
+        SYNDICATION_AUTHOR_SCOPE.format(username=username),
+    ]
+    scopes.extend(
+        SYNDICATION_CATEGORY_SCOPE.format(category_slug=slug)
+        for slug in category_slugs if slug
+    )
+    return scopes
+
+
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache():
+    """Whether all workers see one cache, so invalidation reaches them."""
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS
+
+
+def page_cache_enabled():
+    return getattr(settings, 'BLOG_PAGE_CACHE', False) and shared_cache()
+
+
+def _scope_key(scope):
+    return f'{SCOPE_PREFIX}:{scope}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def scope_versions(scopes):
+    keys = [_scope_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*scopes):
+    # A fresh value rather than incr(), which is a get and a set on some
+    # backends: two concurrent bumps could write the same version.
+    cache.set_many({
+        _scope_key(scope): _new_version() for scope in set(scopes)
+    }, None)
+
+
+def cached_count(name, queryset):
+    """``queryset.count()`` cached until a post or the taxonomy changes.
+
+    Scheduled posts go live without a save, so the count also expires
+    after ``BLOG_COUNT_CACHE_TIMEOUT`` seconds.
+    """
+    versions = '.'.join(
+        str(version)
+        for version in scope_versions([PUBLISHED_SCOPE, TAXONOMY_SCOPE])
+    )
+    key = f'{COUNT_PREFIX}:{versions}:{name}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count,
+                  getattr(settings, 'BLOG_COUNT_CACHE_TIMEOUT', 300))
+    return count
+
+
+def _count(stat):
+    metrics.inc('blog_cache_requests_total', cache='page',
+                result=metrics.CACHE_RESULTS[stat])
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def page_cache_stats():
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {
+        stat: values.get(key, 0) for stat, key in STATS_KEYS.items()
+    }
+    total = stats['hits'] + stats['misses']
+    stats['ratio'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_page_cache_stats():
+    cache.delete_many(STATS_KEYS.values())
+
+
+def _page_key(request, scopes):
+    versions = '.'.join(str(version) for version in scope_versions(scopes))
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_PREFIX}:{versions}:{path}'
+
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def _serve_cached(key, timeout, view, request, *args, **kwargs):
+    """Serve ``key`` from the cache, with the validators of the page.
+
+    The ETag and Last-Modified the view sent are stored with the page, so
+    a hit answers conditional requests without running the view.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        _count('hits')
+        content, content_type, validators = cached
+        response = HttpResponse(content, content_type=content_type)
+        for header, value in validators.items():
+            response[header] = value
+        response = get_conditional_response(
+            request, etag=validators.get('ETag'),
+            last_modified=parse_http_date_safe(
+                validators.get('Last-Modified')
+            ),
+            response=response,
+        )
+        response['X-Page-Cache'] = 'HIT'
+        return response
+    _count('misses')
+    response = view(request, *args, **kwargs)
+    if response.status_code == 200 and not response.cookies:
+        validators = {
+            header: response[header]
+            for header in VALIDATOR_HEADERS if response.has_header(header)
+        }
+        cache.set(key, (response.content, response['Content-Type'],
+                        validators), timeout)
+    response['X-Page-Cache'] = 'MISS'
+    return response
+
+
+def cache_anonymous_page(*scopes):
+    """Cache GET responses for anonymous users.
+
+    ``scopes`` are format strings filled from the view kwargs, e.g.
+    ``'post:{post_id}'``; bumping any of them via ``invalidate()`` drops
+    every cached page of that scope, whatever its page or cursor.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not page_cache_enabled()
+                    or request.method != 'GET'
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            key = _page_key(
+                request, [scope.format(**kwargs) for scope in scopes]
+            )
+            return _serve_cached(
+                key, getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 300),
+                view, request, *args, **kwargs
+            )
+        return wrapper
+    return decorator
+
+
+def cache_public_page(*scopes):
+    """Always cache a page that looks the same for every visitor.
+
+    The ETag is derived from the scope versions, so a conditional request
+    is answered with 304 without touching the database.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = _page_key(
+                request, [scope.format(**kwargs) for scope in scopes]
+            )
+            etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+            response = _serve_cached(
+                key, getattr(settings, 'BLOG_FEED_CACHE_TIMEOUT', 600),
+                view, request, *args, **kwargs
+            )
+            if response.status_code == 200:
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
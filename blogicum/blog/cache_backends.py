@@ -0,0 +1,31 @@
+import os
+import time
+
+from django.core.cache.backends import filebased
+from django.core.cache.backends.base import BaseCache
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    """``FileBasedCache`` that counts its files at most every few seconds.
+
+    The stock backend lists the whole cache directory on every ``set()``
+    to decide whether to cull. ``CULL_INTERVAL`` (in ``OPTIONS``, seconds)
+    spaces those checks out; in between the cache may run slightly over
+    ``MAX_ENTRIES``. The directory is created on the first write, not
+    when the cache is opened.
+    """
+
+    def __init__(self, dir, params):
+        options = dict(params.get('OPTIONS', {}))
+        self.cull_interval = float(options.pop('CULL_INTERVAL', 10))
+        BaseCache.__init__(self, {**params, 'OPTIONS': options})
+        self._dir = os.path.abspath(dir)
+        self._culled_at = None
+
+    def _cull(self):
+        now = time.monotonic()
+        if (self._culled_at is not None
+                and now - self._culled_at < self.cull_interval):
+            return
+        self._culled_at = now
+        super()._cull()
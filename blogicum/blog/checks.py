@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .cache import shared_cache
+
+HINT = ('Укажите в CACHES общий для всех процессов бэкенд: Redis, '
+        'Memcached или DatabaseCache.')
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Scope versions live in the cache and must be seen by every worker."""
+    if shared_cache():
+        return []
+    if getattr(settings, 'BLOG_PAGE_CACHE', False):
+        return [Error(
+            'BLOG_PAGE_CACHE требует общего кеша: с кешем в памяти процесса '
+            'сброс страниц не доходит до других воркеров, кеш страниц '
+            'отключён.',
+            hint=HINT, id='blog.E001',
+        )]
+    return [Warning(
+        'Кеш в памяти процесса: версии областей кеша у каждого воркера '
+        'свои, и ETag лент могут отвечать устаревшим 304.',
+        hint=HINT, id='blog.W001',
+    )]
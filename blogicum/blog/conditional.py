@@ -0,0 +1,99 @@
+import hashlib
+
+from django.views.decorators.http import condition
+
+from .paginators import CursorPaginator
+
+FEED_VALIDATOR_FIELDS = (
+    'id', 'pub_date', 'updated_at', 'comment_count',
+    'author', 'author__username',
+    'category', 'category__updated_at',
+    'location', 'location__updated_at',
+)
+
+
+class Validators:
+    def __init__(self, request, parts, timestamps=()):
+        user = request.user
+        self.etag = hashlib.md5(
+            repr((user.pk if user.is_authenticated else None, parts)).encode()
+        ).hexdigest()
+        self.last_modified = max(filter(None, timestamps), default=None)
+
+
+def feed_validators(request, queryset, per_page, count, extra=()):
+    """Fingerprint one feed page without rendering it.
+
+    Runs the page query of the view over a narrow column set: ids, row
+    count, ``updated_at`` of every related row and the comment counts,
+    which change through ``F()`` updates that skip ``auto_now``. The
+    total returned by ``count`` covers the page links.
+    """
+    page = CursorPaginator(
+        queryset.only(*FEED_VALIDATOR_FIELDS), per_page, count=count
+    ).get_page(after=request.GET.get('after'),
+               before=request.GET.get('before'))
+    return page_validators(request, page, extra)
+
+
+def page_validators(request, page, extra=()):
+    """Fingerprint a feed page the view has fetched already.
+
+    ETag only: a deleted post or a scheduled one coming due changes the
+    page without moving any ``updated_at`` on it, so a Last-Modified
+    taken from them would answer a stale 304.
+    """
+    parts = [extra]
+    for post in page:
+        category, location = post.category, post.location
+        stamps = (
+            post.updated_at,
+            category and category.updated_at,
+            location and location.updated_at,
+        )
+        parts.append((post.pk, post.comment_count,
+                      post.author.username, stamps))
+    parts.append((len(page), page.has_next(), page.has_previous(),
+                  page.number, page.paginator.count))
+    return Validators(request, parts)
+
+
+def post_validators(request, post):
+    """Fingerprint a post page from the post the view is about to render.
+
+    Comment signals touch ``Post.updated_at``, so the post row alone
+    tells whether its thread changed.
+    """
+    category, location = post.category, post.location
+    timestamps = (
+        post.updated_at,
+        category and category.updated_at,
+        location and location.updated_at,
+    )
+    return Validators(request, (post.pk, post.author.username, timestamps),
+                      timestamps)
+
+
+def conditional_page(get_validators):
+    """``django.views.decorators.http.condition`` fed by ``get_validators``.
+
+    ``get_validators(request, *args, **kwargs)`` returns ``Validators`` or
+    ``None``; it runs once per request even though ``condition`` asks for
+    the ETag and Last-Modified separately.
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_blog_validators'):
+            request._blog_validators = get_validators(
+                request, *args, **kwargs
+            )
+        return request._blog_validators
+
+    def etag(request, *args, **kwargs):
+        result = validators(request, *args, **kwargs)
+        return result and result.etag
+
+    def last_modified(request, *args, **kwargs):
+        result = validators(request, *args, **kwargs)
+        return result and result.last_modified
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
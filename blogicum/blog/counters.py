@@ -0,0 +1,207 @@
+"""Published-post counts per category and per author.
+
+A post is counted when it is published, its category is published and
+its ``pub_date`` is not later than the ``post_counters`` checkpoint.
+``advance()`` moves the checkpoint to now and counts the scheduled
+posts that became due on the way; page views (``advance_if_stale()``)
+and the scheduler call it. Post signals only read the checkpoint and
+apply the delta of the saved post against it, so a post is never
+counted twice and a save does not contend for the checkpoint row. Anything that
+writes posts without signals (bulk imports, raw SQL) should finish
+with ``rebuild()``.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Checkpoint, Post, PostCounter
+
+CHECKPOINT = 'post_counters'
+
+_last_advance = {'at': 0.0}
+
+
+def counted_posts(until):
+    return Post.objects.published(until)
+
+
+def add(scope, key, delta):
+    if key is None or not delta:
+        return
+    # Create the row first, so concurrent callers never race to insert it.
+    PostCounter.objects.bulk_create(
+        [PostCounter(scope=scope, key=key, published=0)],
+        ignore_conflicts=True,
+    )
+    PostCounter.objects.filter(scope=scope, key=key).update(
+        published=F('published') + delta
+    )
+
+
+def add_post(key, delta):
+    """Add ``delta`` for a post counted under ``key=(category, author)``."""
+    if key is None:
+        return
+    category_id, author_id = key
+    add(PostCounter.CATEGORY, category_id, delta)
+    add(PostCounter.AUTHOR, author_id, delta)
+
+
+def store(scope, counts, keys=()):
+    """Overwrite the counters of ``keys`` (and every key in ``counts``)."""
+    for key in {*keys, *counts}:
+        PostCounter.objects.update_or_create(
+            scope=scope, key=key,
+            defaults={'published': counts.get(key, 0)}
+        )
+
+
+def grouped(queryset, field):
+    return dict(queryset.order_by().values_list(field).annotate(
+        total=Count('id')
+    ))
+
+
+def checkpoint():
+    return Checkpoint.objects.filter(
+        name=CHECKPOINT
+    ).values_list('reached_at', flat=True).first()
+
+
+def reached():
+    """The checkpoint, counting everything first if there is none yet."""
+    return checkpoint() or advance()
+
+
+@transaction.atomic
+def rebuild(now=None):
+    now = now or timezone.now()
+    posts = counted_posts(now)
+    PostCounter.objects.all().delete()
+    PostCounter.objects.bulk_create(
+        PostCounter(scope=scope, key=key, published=total)
+        for scope, field in ((PostCounter.CATEGORY, 'category_id'),
+                             (PostCounter.AUTHOR, 'author_id'))
+        for key, total in grouped(posts, field).items()
+    )
+    Checkpoint.objects.update_or_create(
+        name=CHECKPOINT, defaults={'reached_at': now}
+    )
+    return now
+
+
+@transaction.atomic
+def advance(now=None):
+    """Count posts that became due since the checkpoint; return it.
+
+    The interval is claimed by moving the checkpoint with a
+    compare-and-swap first; a caller that loses the race counts nothing
+    and returns the checkpoint the winner set.
+    """
+    now = now or timezone.now()
+    reached_at = checkpoint()
+    if reached_at is None:
+        return rebuild(now)
+    if reached_at >= now:
+        return reached_at
+    claimed = Checkpoint.objects.filter(
+        name=CHECKPOINT, reached_at=reached_at
+    ).update(reached_at=now)
+    if claimed != 1:
+        return checkpoint()
+    due = counted_posts(now).filter(pub_date__gt=reached_at)
+    for scope, field in ((PostCounter.CATEGORY, 'category_id'),
+                         (PostCounter.AUTHOR, 'author_id')):
+        for key, total in grouped(due, field).items():
+            add(scope, key, total)
+    return now
+
+
+def counted_key(values, reached_at):
+    """``(category_id, author_id)`` if a post row is counted, else None."""
+    if (values and values['is_visible']
+            and values['pub_date'] <= reached_at):
+        return values['category_id'], values['author_id']
+    return None
+
+
+def post_values(post_id):
+    return Post.objects.filter(pk=post_id).values(
+        'is_visible', 'pub_date', 'category_id', 'author_id',
+        'category__slug',
+    ).first()
+
+
+@transaction.atomic
+def recount_category(category_id, author_ids=None):
+    """Recount a category and its authors after it was (un)published."""
+    reached_at = advance()
+    if author_ids is None:
+        author_ids = set(Post.objects.filter(
+            category_id=category_id
+        ).values_list('author_id', flat=True).distinct())
+    posts = counted_posts(reached_at)
+    store(PostCounter.CATEGORY,
+          grouped(posts.filter(category_id=category_id), 'category_id'),
+          keys=[category_id])
+    store(PostCounter.AUTHOR,
+          grouped(posts.filter(author_id__in=author_ids), 'author_id'),
+          keys=author_ids)
+
+
+def advance_if_stale():
+    """``advance()`` at most once per ``BLOG_COUNTERS_REFRESH`` seconds.
+
+    Keeps page views from writing the checkpoint on every request while
+    scheduled posts still show up in the counts soon after they are due.
+    """
+    interval = getattr(settings, 'BLOG_COUNTERS_REFRESH', 60)
+    if time.monotonic() - _last_advance['at'] >= interval:
+        advance()
+        _last_advance['at'] = time.monotonic()
+
+
+def category_count(category_id):
+    advance_if_stale()
+    return PostCounter.objects.filter(
+        scope=PostCounter.CATEGORY, key=category_id
+    ).values_list('published', flat=True).first() or 0
+
+
+def author_count(author_id):
+    advance_if_stale()
+    return PostCounter.objects.filter(
+        scope=PostCounter.AUTHOR, key=author_id
+    ).values_list('published', flat=True).first() or 0
+
+
+def total_count():
+    advance_if_stale()
+    return PostCounter.objects.filter(
+        scope=PostCounter.CATEGORY
+    ).aggregate(total=Sum('published'))['total'] or 0
+
+
+def drift():
+    """Return ``{(scope, key): (stored, actual)}`` for wrong counters."""
+    reached_at = checkpoint() or timezone.now()
+    posts = counted_posts(reached_at)
+    actual = {
+        (scope, key): total
+        for scope, field in ((PostCounter.CATEGORY, 'category_id'),
+                             (PostCounter.AUTHOR, 'author_id'))
+        for key, total in grouped(posts, field).items()
+    }
+    stored = {
+        (scope, key): published
+        for scope, key, published in PostCounter.objects.values_list(
+            'scope', 'key', 'published')
+    }
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in {*stored, *actual}
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .cache import (SYNDICATION_AUTHOR_SCOPE, SYNDICATION_CATEGORY_SCOPE,
+                    SYNDICATION_SCOPE, TAXONOMY_SCOPE, cache_public_page)
+from .models import Category, Post
+
+User = get_user_model()
+
+FEED_ITEMS = 20
+DESCRIPTION_WORDS = 60
+
+
+class LatestPostsFeed(Feed):
+    title = 'Блогикум'
+    link = reverse_lazy('blog:homepage')
+    description = 'Новые публикации Блогикума.'
+
+    def published_posts(self):
+        return Post.objects.visible_to()
+
+    def items(self, obj=None):
+        return self.published_posts()[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+    def description(self, obj):
+        return obj.description
+
+    def items(self, obj):
+        return self.published_posts().filter(
+            category_id=obj.pk
+        )[:FEED_ITEMS]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум: @{obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}.'
+
+    def items(self, obj):
+        return self.published_posts().filter(
+            author_id=obj.pk
+        )[:FEED_ITEMS]
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj=None):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
+
+
+site_scopes = cache_public_page(SYNDICATION_SCOPE, TAXONOMY_SCOPE)
+category_scopes = cache_public_page(SYNDICATION_CATEGORY_SCOPE, TAXONOMY_SCOPE)
+author_scopes = cache_public_page(SYNDICATION_AUTHOR_SCOPE, TAXONOMY_SCOPE)
+
+latest_rss = site_scopes(LatestPostsFeed())
+latest_atom = site_scopes(LatestPostsAtomFeed())
+category_rss = category_scopes(CategoryPostsFeed())
+category_atom = category_scopes(CategoryPostsAtomFeed())
+author_rss = author_scopes(AuthorPostsFeed())
+author_atom = author_scopes(AuthorPostsAtomFeed())
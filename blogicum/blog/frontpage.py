@@ -0,0 +1,205 @@
+"""The materialized homepage window.
+
+``FrontPageEntry`` holds the newest ``BLOG_FRONT_PAGE_SIZE`` public
+posts. Post signals call ``sync()`` for the changed post, the scheduler
+for the posts it promotes; renamed authors, categories and locations are
+patched in place, while (un)publishing a category and bulk writes call
+``rebuild()``. The window is trusted until the next scheduled post comes
+due (``valid_until()``, kept in the cache). A homepage page is served
+from the window only when the window provably holds it; anything further
+back falls through to the live query.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import FrontPageEntry, Post
+from .paginators import CursorPaginator
+
+
+UNTIL_KEY = 'blog:front_page:until'
+# A reader racing a commit may cache a stale bound; it lives this long.
+UNTIL_TIMEOUT = 60
+FOREVER = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def window_size():
+    return getattr(settings, 'BLOG_FRONT_PAGE_SIZE', 100)
+
+
+def candidates(now):
+    return Post.objects.published(now).with_relations()
+
+
+def valid_until():
+    """When the next scheduled post comes due and the window goes stale."""
+    until = cache.get(UNTIL_KEY)
+    if until is None:
+        until = Post.objects.filter(
+            is_visible=True, pub_date__gt=timezone.now()
+        ).order_by('pub_date').values_list(
+            'pub_date', flat=True
+        ).first() or FOREVER
+        cache.set(UNTIL_KEY, until, UNTIL_TIMEOUT)
+    return until
+
+
+def forget_valid_until():
+    # After the commit, so that the next reader sees the new posts.
+    transaction.on_commit(lambda: cache.delete(UNTIL_KEY))
+
+
+def entry(post):
+    category, location = post.category, post.location
+    return FrontPageEntry(
+        id=post.pk,
+        pub_date=post.pub_date,
+        title=post.title,
+        text=post.text,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        category_id=category.pk,
+        category_slug=category.slug,
+        category_title=category.title,
+        location_name=location.name if post.location_visible else '',
+        image=post.image.name or '',
+        image_variants=post.image_variants,
+        comment_count=post.comment_count,
+        updated_at=max(filter(None, (
+            post.updated_at, category.updated_at,
+            location and location.updated_at,
+        ))),
+    )
+
+
+@transaction.atomic
+def rebuild():
+    now = timezone.now()
+    FrontPageEntry.objects.all().delete()
+    FrontPageEntry.objects.bulk_create(
+        map(entry, candidates(now)[:window_size()]), ignore_conflicts=True
+    )
+    forget_valid_until()
+
+
+@transaction.atomic
+def sync(*post_ids):
+    """Re-render the entries of ``post_ids`` and restore the window."""
+    now = timezone.now()
+    size = window_size()
+    forget_valid_until()
+    FrontPageEntry.objects.filter(id__in=post_ids).delete()
+    # A concurrent sync may insert the same rows; either copy will do.
+    FrontPageEntry.objects.bulk_create(
+        map(entry, candidates(now).filter(pk__in=post_ids)),
+        ignore_conflicts=True,
+    )
+    overflow = list(FrontPageEntry.objects.values_list(
+        'id', flat=True
+    )[size:])
+    if overflow:
+        FrontPageEntry.objects.filter(id__in=overflow).delete()
+        return
+    missing = size - FrontPageEntry.objects.count()
+    if missing > 0:
+        FrontPageEntry.objects.bulk_create(map(entry, candidates(now).exclude(
+            pk__in=FrontPageEntry.objects.values('id')
+        )[:missing]), ignore_conflicts=True)
+
+
+def copy_comment_counts():
+    """Copy ``Post.comment_count`` into the entries that disagree."""
+    actual = Subquery(Post.objects.filter(
+        pk=OuterRef('id')
+    ).values('comment_count')[:1])
+    return FrontPageEntry.objects.exclude(
+        comment_count=actual
+    ).update(comment_count=actual)
+
+
+def touched(entries, updated_at, **fields):
+    """Rewrite ``fields`` of the ``entries`` that render them stale."""
+    return entries.exclude(Q(**fields)).update(
+        updated_at=Greatest('updated_at', Value(updated_at)), **fields
+    )
+
+
+def rename_author(user):
+    return FrontPageEntry.objects.filter(author_id=user.pk).exclude(
+        author_username=user.username
+    ).update(author_username=user.username)
+
+
+def rename_category(category):
+    return touched(
+        FrontPageEntry.objects.filter(category_id=category.pk),
+        category.updated_at,
+        category_slug=category.slug, category_title=category.title,
+    )
+
+
+def rename_location(location):
+    return touched(
+        FrontPageEntry.objects.filter(id__in=Post.objects.filter(
+            location_id=location.pk
+        ).values('id')),
+        location.updated_at,
+        location_name=location.name if location.is_published else '',
+    )
+
+
+class WindowPaginator(CursorPaginator):
+    """``CursorPaginator`` over the window that knows where it ends.
+
+    ``get_page()`` returns None instead of a page the window may hold
+    only in part. A page is whole when its lookahead row came from the
+    window too, or when the window is not full and so holds every
+    visible post.
+    """
+
+    @cached_property
+    def complete(self):
+        return FrontPageEntry.objects.count() < window_size()
+
+    def whole(self, page):
+        return page if page.has_next() or self.complete else None
+
+    def seek_queryset(self):
+        # Page links may lead past the window, so seek in the feed.
+        return Post.objects.published().only('pub_date', 'id')
+
+    def get_page(self, after=None, before=None):
+        cursor = after and self.decode_cursor(after)
+        if cursor:
+            page = self.page_after(*cursor)
+            if not page and self.complete:
+                return self.first_page()
+            return self.whole(page)
+        cursor = before and self.decode_cursor(before)
+        if cursor:
+            (pub_date, pk), number = cursor
+            inside = self.object_list.filter(pk=pk, pub_date=pub_date)
+            if not (self.complete or inside.exists()):
+                return None
+            return self.page_before(*cursor)
+        return self.whole(self.first_page())
+
+
+def get_page(request, per_page, count):
+    """The homepage page from the window, or None to use the live query."""
+    if timezone.now() >= valid_until():
+        return None
+    paginator = WindowPaginator(
+        FrontPageEntry.objects.all(), per_page, count=count
+    )
+    page = paginator.get_page(after=request.GET.get('after'),
+                              before=request.GET.get('before'))
+    if page is not None:
+        page.object_list = [item.as_post() for item in page.object_list]
+    return page
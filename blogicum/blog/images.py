@@ -0,0 +1,59 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANTS_DIR = 'post_images/variants'
+VARIANT_WIDTHS = {
+    'placeholder': 24,
+    'card': 640,
+    'detail': 1280,
+}
+JPEG_QUALITY = 82
+
+
+class ImageVariant:
+    def __init__(self, name, width, height):
+        self.name = name
+        self.width = width
+        self.height = height
+
+    @property
+    def url(self):
+        return default_storage.url(self.name)
+
+
+def _encode(image, width):
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=JPEG_QUALITY,
+               optimize=True, progressive=True)
+    return image.size, buffer.getvalue()
+
+
+def build_variants(image_field):
+    """Resize ``image_field`` into every size of ``VARIANT_WIDTHS``.
+
+    Returns a mapping suitable for ``Post.image_variants``.
+    """
+    with image_field.open('rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert('RGB')
+    stem = PurePosixPath(image_field.name).stem
+    variants = {}
+    for variant, width in VARIANT_WIDTHS.items():
+        (width, height), content = _encode(image, width)
+        name = default_storage.save(
+            f'{VARIANTS_DIR}/{stem}_{variant}.jpg', ContentFile(content)
+        )
+        variants[variant] = {'name': name, 'width': width, 'height': height}
+    return variants
+
+
+def delete_variants(variants):
+    for variant in variants.values():
+        default_storage.delete(variant['name'])
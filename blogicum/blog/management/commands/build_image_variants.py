@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.models import Post
+
+
+def refresh_in_thread(post):
+    try:
+        post.refresh_image_variants()
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии фото для уже опубликованных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков обработки.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для постов, у которых они уже есть.'
+        )
+
+    def refresh_serial(self, posts):
+        for post in posts:
+            try:
+                post.refresh_image_variants()
+            except Exception as error:
+                yield post.pk, error
+            else:
+                yield post.pk, None
+
+    def refresh_parallel(self, posts, workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(refresh_in_thread, post): post.pk
+                for post in posts
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.exception()
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'id', 'image', 'image_variants'
+        )
+        if not options['force']:
+            posts = posts.filter(image_variants={})
+        posts = list(posts)
+        if options['workers'] > 1:
+            results = self.refresh_parallel(posts, options['workers'])
+        else:
+            results = self.refresh_serial(posts)
+        done = failed = 0
+        for pk, error in results:
+            if error:
+                failed += 1
+                self.stderr.write(f'Пост {pk}: {error}')
+            else:
+                done += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано: {done}, с ошибками: {failed}')
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import counters, frontpage, visibility
+from blog.cache import PUBLISHED_SCOPE, TAXONOMY_SCOPE, invalidate
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет флаг видимости постов с публикацией поста и его '
+        'категории; с --repair исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Исправить найденные расхождения.'
+        )
+
+    def handle(self, *args, **options):
+        if options['repair']:
+            fixed = visibility.repair()
+            if any(fixed.values()):
+                counters.rebuild()
+                frontpage.rebuild()
+                invalidate(PUBLISHED_SCOPE, TAXONOMY_SCOPE)
+            self.stdout.write(self.style.SUCCESS(
+                f'Показано постов: {fixed[True]}, '
+                f'скрыто постов: {fixed[False]}.'
+            ))
+            return
+        drift = visibility.drift()
+        for visible, label in ((True, 'должны быть видны'),
+                               (False, 'должны быть скрыты')):
+            if drift[visible]:
+                ids = ', '.join(map(str, sorted(drift[visible])))
+                self.stdout.write(f'{label}: {ids}')
+        total = len(drift[True]) + len(drift[False])
+        if total:
+            raise CommandError(
+                f'Расхождений: {total}; запустите с --repair.'
+            )
+        self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
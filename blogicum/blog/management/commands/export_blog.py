@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Commentary, Location, Post
+from blog.transfer import (CATEGORY_FIELDS, COMMENT_FIELDS, LOCATION_FIELDS,
+                           POST_FIELDS, DumpEncoder, Throughput, read_image)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает категории, места, публикации и комментарии в JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию — стандартный вывод.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из БД за один запрос.'
+        )
+        parser.add_argument(
+            '--no-images', action='store_true',
+            help='Не встраивать файлы фото в выгрузку.'
+        )
+
+    def rows(self, queryset, fields, chunk_size):
+        lookups = fields.values()
+        for row in queryset.values(*lookups).iterator(chunk_size=chunk_size):
+            yield {name: row[lookup] for name, lookup in fields.items()}
+
+    def records(self, chunk_size, images):
+        sources = (
+            ('category', Category.objects.order_by('id'), CATEGORY_FIELDS),
+            ('location', Location.objects.order_by('id'), LOCATION_FIELDS),
+            ('post', Post.objects.order_by('id'), POST_FIELDS),
+            ('comment', Commentary.objects.order_by('id'), COMMENT_FIELDS),
+        )
+        for record_type, queryset, fields in sources:
+            for row in self.rows(queryset, fields, chunk_size):
+                if record_type == 'post':
+                    row['image'] = (
+                        read_image(row['image']) if images
+                        else row['image'] and {'name': row['image']}
+                    )
+                yield {'type': record_type, **row}
+
+    def handle(self, *args, **options):
+        path = options['path']
+        output = (
+            self.stdout if path == '-'
+            else open(path, 'w', encoding='utf-8')
+        )
+        encoder = DumpEncoder(ensure_ascii=False)
+        throughput = Throughput()
+        try:
+            for record in self.records(options['chunk_size'],
+                                       not options['no_images']):
+                output.write(encoder.encode(record) + '\n')
+                throughput.add(1)
+        finally:
+            if output is not self.stdout:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(f'Выгружено: {throughput}'))
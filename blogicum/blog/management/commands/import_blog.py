@@ -0,0 +1,220 @@
+import json
+import sys
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog import counters, frontpage, scheduling, visibility
+from blog.cache import TAXONOMY_SCOPE, invalidate
+from blog.models import Category, Commentary, Location, Post
+from blog.transfer import (RECORD_TYPES, Throughput, batched,
+                           keep_created_at, write_image)
+from jobs.registry import enqueue_many
+
+User = get_user_model()
+
+
+class Lookup:
+    """``key -> id`` map filled by one ``IN`` query per batch.
+
+    Cleared after every chunk, so it never holds more than one chunk's
+    keys however long the dump is.
+    """
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.ids = {}
+
+    def missing(self, keys):
+        return {key for key in keys if key and key not in self.ids}
+
+    def load(self, keys):
+        keys = set(keys)
+        missing = self.missing(keys)
+        if missing:
+            self.ids.update(self.queryset.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, 'id'))
+        return self.missing(keys)
+
+    def __getitem__(self, key):
+        return self.ids[key] if key else None
+
+    def clear(self):
+        self.ids.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_blog. Публикации и комментарии '
+        'сохраняют свои id, поэтому загружать их нужно в базу без '
+        'пересекающихся записей.'
+    )
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию — стандартный ввод.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк вставлять одним INSERT.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Сколько строк загружать за одну транзакцию.'
+        )
+
+    def records(self, lines):
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+            if record.get('type') not in RECORD_TYPES:
+                raise CommandError(
+                    f'Строка {number}: неизвестный тип записи.'
+                )
+            yield record
+
+    def datetime(self, value):
+        return parse_datetime(value) if value else timezone.now()
+
+    def import_categories(self, rows):
+        Category.objects.bulk_create((
+            Category(
+                slug=row['slug'],
+                title=row['title'],
+                description=row['description'],
+                is_published=row.get('is_published', True),
+                created_at=self.datetime(row.get('created_at')),
+            ) for row in rows
+        ), batch_size=self.batch_size, ignore_conflicts=True)
+
+    def import_locations(self, rows):
+        existing = dict(Location.objects.filter(
+            id__in=[row['id'] for row in rows]
+        ).values_list('id', 'name'))
+        taken = sorted(
+            row['id'] for row in rows
+            if existing.get(row['id'], row['name']) != row['name']
+        )
+        if taken:
+            raise CommandError(
+                f'Места с id {taken} уже есть в базе под другими названиями.'
+            )
+        Location.objects.bulk_create((
+            Location(
+                id=row['id'],
+                name=row['name'],
+                is_published=row.get('is_published', True),
+                created_at=self.datetime(row.get('created_at')),
+            ) for row in rows if row['id'] not in existing
+        ), batch_size=self.batch_size)
+
+    def resolve_authors(self, rows):
+        new_names = self.authors.load(row['author'] for row in rows)
+        if new_names:
+            User.objects.bulk_create(
+                (User(username=name, password='!') for name in new_names),
+                batch_size=self.batch_size
+            )
+            self.authors.load(new_names)
+
+    def import_posts(self, rows):
+        self.resolve_authors(rows)
+        unknown = self.categories.load(row['category'] for row in rows)
+        if unknown:
+            raise CommandError(f'Неизвестные категории: {sorted(unknown)}')
+        unknown = self.locations.load(row['location'] for row in rows)
+        if unknown:
+            raise CommandError(f'Неизвестные места: {sorted(unknown)}')
+        posts = [
+            Post(
+                id=row['id'],
+                title=row['title'],
+                text=row['text'],
+                pub_date=parse_datetime(row['pub_date']),
+                is_published=row.get('is_published', True),
+                created_at=self.datetime(row.get('created_at')),
+                comment_count=row.get('comment_count', 0),
+                image=write_image(row.get('image')),
+                author_id=self.authors[row['author']],
+                category_id=self.categories[row['category']],
+                location_id=self.locations[row['location']],
+            ) for row in rows
+        ]
+        Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        enqueue_many(
+            'blog.build_image_variants',
+            ({'post_id': post.id} for post in posts if post.image),
+            batch_size=self.batch_size
+        )
+
+    def import_comments(self, rows):
+        self.resolve_authors(rows)
+        Commentary.objects.bulk_create((
+            Commentary(
+                id=row['id'],
+                post_id=row['post'],
+                text=row['text'],
+                created_at=self.datetime(row.get('created_at')),
+                author_id=self.authors[row['author']],
+            ) for row in rows
+        ), batch_size=self.batch_size)
+
+    def import_chunk(self, chunk):
+        by_type = defaultdict(list)
+        for record in chunk:
+            by_type[record['type']].append(record)
+        importers = {
+            'category': self.import_categories,
+            'location': self.import_locations,
+            'post': self.import_posts,
+            'comment': self.import_comments,
+        }
+        with transaction.atomic():
+            for record_type in RECORD_TYPES:
+                if by_type[record_type]:
+                    importers[record_type](by_type[record_type])
+        for lookup in (self.authors, self.categories, self.locations):
+            lookup.clear()
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.authors = Lookup(User.objects.all(), 'username')
+        self.categories = Lookup(Category.objects.all(), 'slug')
+        self.locations = Lookup(Location.objects.all(), 'id')
+        path = options['path']
+        stdin = options.get('stdin', sys.stdin)
+        source = stdin if path == '-' else open(path, encoding='utf-8')
+        throughput = Throughput()
+        try:
+            with keep_created_at(Category, Location, Post, Commentary):
+                for chunk in batched(self.records(source),
+                                     options['chunk_size']):
+                    self.import_chunk(chunk)
+                    throughput.add(len(chunk))
+                    self.stdout.write(f'Загружено: {throughput}')
+        finally:
+            if source is not stdin:
+                source.close()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [Category, Location, Post, Commentary]):
+                cursor.execute(sql)
+        visibility.repair()
+        counters.rebuild()
+        frontpage.rebuild()
+        scheduling.plan_next()
+        invalidate(TAXONOMY_SCOPE)
+        self.stdout.write(self.style.SUCCESS(f'Готово: {throughput}'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кеш страниц для анонимов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"ratio={stats['ratio']:.2%}"
+        )
+        if options['reset']:
+            reset_page_cache_stats()
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.profiling import DEFAULTS, profile_dir, read_config, write_config
+
+
+class Command(BaseCommand):
+    help = (
+        'Включает, выключает и показывает семплирующий профилировщик '
+        'запросов. Работающий сервер подхватывает изменения без перезапуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('on', 'off', 'status'))
+        parser.add_argument(
+            '--sample-rate', type=float, default=DEFAULTS['sample_rate'],
+            help='Доля профилируемых запросов, от 0 до 1.'
+        )
+        parser.add_argument(
+            '--threshold-ms', type=float, default=DEFAULTS['threshold_ms'],
+            help='Сохранять профиль, только если запрос шёл дольше.'
+        )
+        parser.add_argument(
+            '--interval-ms', type=float, default=DEFAULTS['interval_ms'],
+            help='Период снятия стеков.'
+        )
+        parser.add_argument(
+            '--keep', type=int, default=DEFAULTS['keep'],
+            help='Сколько последних профилей хранить.'
+        )
+
+    def handle(self, *args, **options):
+        if options['action'] == 'on':
+            write_config({
+                key: options[key] for key in DEFAULTS
+            })
+        elif options['action'] == 'off':
+            write_config(None)
+        config = read_config()
+        if config is None:
+            self.stdout.write('Профилирование выключено.')
+            return
+        settings = ', '.join(f'{key}={value}' for key, value in config.items())
+        self.stdout.write(
+            f'Профилирование включено: {settings}; каталог {profile_dir()}'
+        )
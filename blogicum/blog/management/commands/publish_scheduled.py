@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog import scheduling
+
+
+class Command(BaseCommand):
+    help = (
+        'Выпускает отложенные посты, чьё время публикации наступило: '
+        'обновляет счётчики и сбрасывает кэш их страниц и лент.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=scheduling.BATCH_SIZE,
+            help='Сколько постов выпускать за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        published = scheduling.publish_due(batch_size=options['batch_size'])
+        scheduling.plan_next()
+        self.stdout.write(
+            self.style.SUCCESS(f'Выпущено постов: {published}.')
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from blog.models import Post
+from blog.search import CREATE_SQL, FTS_TABLE, search_supported
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций.'
+
+    def handle(self, *args, **options):
+        if not search_supported():
+            raise CommandError(
+                'Полнотекстовый поиск работает только на SQLite.'
+            )
+        # 'rebuild' re-reads the content table (blog_post) in a single
+        # statement, so neither readers nor the triggers ever see a
+        # half-built index.
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in CREATE_SQL:
+                cursor.execute(statement)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+            indexed = Post.objects.count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Индекс перестроен: {indexed} публикаций.')
+        )
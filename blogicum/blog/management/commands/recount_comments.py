@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog import frontpage
+from blog.models import Commentary, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def handle(self, *args, **options):
+        counts = Commentary.objects.filter(
+            post_id=OuterRef('pk')
+        ).order_by().values('post_id').annotate(
+            total=Count('id')
+        ).values('total')
+        actual = Coalesce(Subquery(counts), 0)
+        with transaction.atomic():
+            fixed = Post.objects.exclude(
+                comment_count=actual
+            ).update(comment_count=actual)
+            frontpage.copy_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {fixed}')
+        )
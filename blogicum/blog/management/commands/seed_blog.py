@@ -0,0 +1,272 @@
+import random
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from blog import counters, frontpage, scheduling, visibility
+from blog.cache import TAXONOMY_SCOPE, invalidate
+from blog.images import build_variants
+from blog.models import Category, Commentary, Location, Post
+from blog.transfer import Throughput, batched, keep_created_at
+
+User = get_user_model()
+
+VOCABULARY_SIZE = 3000
+PALETTE_SIZE = 12
+UNPUBLISHED_RATIO = 0.05
+FUTURE_RATIO = 0.02
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местами, публикациями и комментариями для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней назад раскидать даты публикаций.'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для распределения комментариев '
+                 'по постам; 0 — равномерно.'
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.0,
+            help='Доля постов с фото-заглушкой.'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug категорий.'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Сначала удалить пользователей и категории с этим '
+                 'префиксом вместе с их публикациями.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def sentence(self, rng, low, high):
+        return ' '.join(
+            rng.choices(self.vocabulary, k=rng.randint(low, high))
+        ).capitalize()
+
+    def paragraph(self, rng, low, high):
+        return ' '.join(
+            self.sentence(rng, 5, 15) + '.'
+            for _ in range(rng.randint(low, high))
+        )
+
+    def created_ids(self, model, last_id):
+        return list(model.objects.filter(
+            id__gt=last_id
+        ).order_by('id').values_list('id', flat=True))
+
+    def last_id(self, model):
+        return model.objects.aggregate(last=Max('id'))['last'] or 0
+
+    def seed_users(self, fake, options):
+        last_id = self.last_id(User)
+        User.objects.bulk_create((
+            User(
+                username=f'{options["prefix"]}_{fake.user_name()}_{number}',
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                password='!',
+            ) for number in range(options['users'])
+        ), batch_size=options['batch_size'])
+        return self.created_ids(User, last_id)
+
+    def seed_taxonomy(self, fake, rng, options):
+        last_category = self.last_id(Category)
+        Category.objects.bulk_create(
+            Category(
+                title=self.sentence(rng, 1, 3),
+                description=self.paragraph(rng, 1, 2),
+                slug=f'{options["prefix"]}-{number}',
+                created_at=self.now,
+            ) for number in range(options['categories'])
+        )
+        last_location = self.last_id(Location)
+        Location.objects.bulk_create(
+            Location(name=fake.city(), created_at=self.now)
+            for _ in range(options['locations'])
+        )
+        return (self.created_ids(Category, last_category),
+                self.created_ids(Location, last_location))
+
+    def seed_images(self, rng, ratio):
+        if not ratio:
+            return []
+        images = []
+        for number in range(PALETTE_SIZE):
+            buffer = BytesIO()
+            color = tuple(rng.randrange(256) for _ in range(3))
+            Image.new('RGB', (1600, 1200), color).save(buffer, 'JPEG')
+            name = default_storage.save(
+                f'post_images/seed_{number}.jpg',
+                ContentFile(buffer.getvalue())
+            )
+            variants = build_variants(Post(image=name).image)
+            images.append((name, variants))
+        return images
+
+    def comment_targets(self, options):
+        """Yield the post index of every comment, hot posts first.
+
+        Post ``i`` gets weight ``1 / (i + 1) ** skew``; pub dates are
+        random, so the hot posts are spread over the whole feed.
+        """
+        rng = random.Random(options['seed'] + 1)
+        weights = accumulate(
+            1 / (index + 1) ** options['skew']
+            for index in range(options['posts'])
+        )
+        cum_weights = list(weights)
+        population = range(options['posts'])
+        remaining = options['comments']
+        while remaining > 0:
+            size = min(remaining, options['batch_size'])
+            yield from rng.choices(population, cum_weights=cum_weights,
+                                   k=size)
+            remaining -= size
+
+    def post_rows(self, rng, options, users, categories, locations, images,
+                  comment_counts, pub_dates):
+        now, span = self.now, options['days'] * 86400
+        for index in range(options['posts']):
+            if rng.random() < FUTURE_RATIO:
+                pub_date = now + timedelta(seconds=rng.randrange(86400 * 30))
+            else:
+                pub_date = now - timedelta(seconds=rng.randrange(span))
+            pub_dates.append(pub_date)
+            name, variants = (
+                rng.choice(images) if images
+                and rng.random() < options['image_ratio'] else ('', {})
+            )
+            yield Post(
+                title=self.sentence(rng, 2, 8),
+                text=self.paragraph(rng, 2, 12),
+                pub_date=pub_date,
+                created_at=min(pub_date, now),
+                is_published=rng.random() >= UNPUBLISHED_RATIO,
+                author_id=rng.choice(users),
+                category_id=rng.choice(categories),
+                location_id=(
+                    rng.choice(locations) if rng.random() < 0.7 else None
+                ),
+                image=name,
+                image_variants=variants,
+                comment_count=comment_counts[index],
+            )
+
+    def comment_rows(self, rng, options, users, post_ids, pub_dates):
+        now = self.now
+        for index in self.comment_targets(options):
+            since = min(pub_dates[index], now)
+            delay = rng.random() * (now - since).total_seconds()
+            yield Commentary(
+                post_id=post_ids[index],
+                author_id=rng.choice(users),
+                text=self.sentence(rng, 3, 30),
+                created_at=since + timedelta(seconds=delay),
+            )
+
+    def insert(self, model, rows, options, throughput):
+        for batch in batched(rows, options['batch_size']):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            throughput.add(len(batch))
+
+    def delete_rows(self, queryset):
+        """Plain SQL ``DELETE`` of ``queryset``, without per-row signals.
+
+        The counters, the visibility flags and the homepage window are
+        repaired in bulk once the new rows are in.
+        """
+        sql, params = queryset.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {queryset.model._meta.db_table} '
+                f'WHERE id IN ({sql})', params
+            )
+
+    def clear_previous(self, options):
+        prefix = options['prefix']
+        users = User.objects.filter(username__startswith=f'{prefix}_')
+        categories = Category.objects.filter(slug__startswith=f'{prefix}-')
+        if not options['clear']:
+            if users.exists() or categories.exists():
+                raise CommandError(
+                    f'В базе уже есть данные с префиксом «{prefix}». '
+                    f'Укажите другой --prefix или --clear, чтобы удалить их.'
+                )
+            return
+        posts = Post.objects.filter(
+            Q(author__in=users) | Q(category__in=categories)
+        )
+        with transaction.atomic():
+            self.delete_rows(Commentary.objects.filter(
+                Q(post__in=posts) | Q(author__in=users)
+            ))
+            self.delete_rows(posts)
+            users.delete()
+            categories.delete()
+        # Seeded users may have commented on posts that stay.
+        call_command('recount_comments', stdout=self.stdout)
+
+    def handle(self, *args, **options):
+        self.clear_previous(options)
+        self.now = timezone.now()
+        rng = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        self.vocabulary = fake.words(VOCABULARY_SIZE)
+        throughput = Throughput()
+
+        with keep_created_at(Category, Location, Post, Commentary):
+            users = self.seed_users(fake, options)
+            categories, locations = self.seed_taxonomy(fake, rng, options)
+            throughput.add(len(users) + len(categories) + len(locations))
+            images = self.seed_images(rng, options['image_ratio'])
+
+            comment_counts = [0] * options['posts']
+            for index in self.comment_targets(options):
+                comment_counts[index] += 1
+            pub_dates = []
+            last_post = self.last_id(Post)
+            self.insert(Post, self.post_rows(
+                rng, options, users, categories, locations, images,
+                comment_counts, pub_dates
+            ), options, throughput)
+            self.stdout.write(f'Публикации: {throughput}')
+            post_ids = self.created_ids(Post, last_post)
+
+            self.insert(Commentary, self.comment_rows(
+                rng, options, users, post_ids, pub_dates
+            ), options, throughput)
+        visibility.repair()
+        counters.rebuild()
+        frontpage.rebuild()
+        scheduling.plan_next()
+        invalidate(TAXONOMY_SCOPE)
+        self.stdout.write(self.style.SUCCESS(f'Готово: {throughput}'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Учитывает в счётчиках публикаций посты, чьё время публикации '
+        'наступило; с --check ищет расхождения, с --rebuild пересчитывает '
+        'счётчики с нуля.'
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            '--check', action='store_true',
+            help='Сравнить счётчики с полным пересчётом.'
+        )
+        group.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать все счётчики.'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reached_at = counters.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(f'Счётчики пересчитаны на {reached_at}.')
+            )
+            return
+        if options['check']:
+            drift = counters.drift()
+            for (scope, key), (stored, actual) in sorted(drift.items()):
+                self.stdout.write(
+                    f'{scope}:{key}: записано {stored}, на самом деле {actual}'
+                )
+            if drift:
+                raise CommandError(
+                    f'Расхождений: {len(drift)}; запустите с --rebuild.'
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        reached_at = counters.advance()
+        self.stdout.write(
+            self.style.SUCCESS(f'Счётчики актуальны на {reached_at}.')
+        )
@@ -0,0 +1,262 @@
+"""Prometheus metrics shared by every worker process.
+
+Each process adds increments to an in-memory buffer; a daemon thread
+flushes it every ``BLOG_METRICS_FLUSH_INTERVAL`` seconds as
+``value = value + delta`` upserts into a small SQLite file
+(``BLOG_METRICS_PATH``), so the totals of all processes add up there.
+The scraping process flushes its own buffer before reading.
+
+The endpoint answers only requests bearing ``BLOG_METRICS_TOKEN`` in an
+``Authorization: Bearer`` header and is off while the setting is empty.
+"""
+import atexit
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.worker import ready_jobs
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+FAMILIES = {
+    'blog_http_requests_total': (
+        'counter', 'HTTP requests by URL name, method and status.'),
+    'blog_http_request_duration_seconds': (
+        'histogram', 'Request latency by URL name.'),
+    'blog_db_queries_total': (
+        'counter', 'SQL queries issued while serving requests.'),
+    'blog_db_query_duration_seconds_total': (
+        'counter', 'Time spent in SQL while serving requests.'),
+    'blog_cache_requests_total': (
+        'counter', 'Page and fragment cache lookups by result.'),
+    'blog_jobs': (
+        'gauge', 'Background jobs by status.'),
+    'blog_jobs_ready': (
+        'gauge', 'Jobs a worker could claim right now.'),
+}
+CACHE_RESULTS = {'hits': 'hit', 'misses': 'miss'}
+HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS samples ('
+    'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, '
+    'PRIMARY KEY (name, labels))'
+)
+UPSERT = (
+    'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+    'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value'
+)
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\')
+            .replace('"', r'\"').replace('\n', r'\n'))
+
+
+def render_labels(labels):
+    return ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    )
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsStore:
+    def __init__(self, path, flush_interval=1.0):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending = defaultdict(float)
+        self.pid = None
+        self.flusher = None
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=10,
+                                     isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(SCHEMA)
+        return connection
+
+    def _start_flusher(self):
+        if self.pid == os.getpid():
+            return
+        # After a fork the child inherits the parent's unflushed deltas.
+        self.pid = os.getpid()
+        self.pending.clear()
+        if self.flush_interval:
+            self.flusher = threading.Thread(
+                target=self._flush_forever, name='blog-metrics', daemon=True
+            )
+            self.flusher.start()
+
+    def _flush_forever(self):
+        stop = threading.Event()
+        while not stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush metrics to %s', self.path)
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            self._start_flusher()
+            self.pending[name, render_labels(labels)] += value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self.lock:
+            self._start_flusher()
+            for bound in buckets:
+                if value <= bound:
+                    self.pending[f'{name}_bucket', render_labels(
+                        {**labels, 'le': repr(bound)})] += 1
+            self.pending[f'{name}_bucket', render_labels(
+                {**labels, 'le': '+Inf'})] += 1
+            self.pending[f'{name}_sum', render_labels(labels)] += value
+            self.pending[f'{name}_count', render_labels(labels)] += 1
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, defaultdict(float)
+        try:
+            connection = self.connect()
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.executemany(UPSERT, (
+                    (name, labels, value)
+                    for (name, labels), value in batch.items()
+                ))
+                connection.execute('COMMIT')
+            finally:
+                connection.close()
+        except Exception:
+            # Keep the deltas for the next flush.
+            with self.lock:
+                for key, value in batch.items():
+                    self.pending[key] += value
+            raise
+
+    def samples(self):
+        self.flush()
+        connection = self.connect()
+        try:
+            return connection.execute(
+                'SELECT name, labels, value FROM samples ORDER BY rowid'
+            ).fetchall()
+        finally:
+            connection.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store():
+    path = getattr(settings, 'BLOG_METRICS_PATH',
+                   settings.BASE_DIR / 'metrics.sqlite3')
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = MetricsStore(path, getattr(
+                settings, 'BLOG_METRICS_FLUSH_INTERVAL', 1.0
+            ))
+        return _stores[path]
+
+
+@atexit.register
+def _flush_on_exit():
+    for metrics_store in list(_stores.values()):
+        if metrics_store.pid == os.getpid():
+            metrics_store.flush()
+
+
+def inc(name, value=1, **labels):
+    store().inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    store().observe(name, value, **labels)
+
+
+def family_of(name):
+    for suffix in HISTOGRAM_SUFFIXES:
+        family = name[:-len(suffix)]
+        if name.endswith(suffix) and FAMILIES.get(family, ('',))[0] == (
+                'histogram'):
+            return family
+    return name
+
+
+def job_samples():
+    counts = dict(Job.objects.order_by().values_list('status').annotate(
+        total=models.Count('id')
+    ))
+    for status, _ in Job.STATUSES:
+        yield 'blog_jobs', render_labels({'status': status}), counts.get(
+            status, 0)
+    yield 'blog_jobs_ready', '', ready_jobs(timezone.now()).count()
+
+
+def sample_line(name, labels, value):
+    series = f'{name}{{{labels}}}' if labels else name
+    return f'{series} {format_value(value)}'
+
+
+def histogram_samples(family, samples):
+    """Every bucket of ``LATENCY_BUCKETS`` per series, ``le`` ascending.
+
+    Buckets are cumulative, so one that was never incremented is 0.
+    """
+    series = defaultdict(dict)
+    for name, labels, value in samples:
+        if name.endswith('_bucket'):
+            labels, _, bound = labels.rpartition('le="')
+            series[labels.rstrip(',')][bound[:-1]] = value
+        else:
+            series[labels][name] = value
+    for labels, values in series.items():
+        for bound in (*map(repr, LATENCY_BUCKETS), '+Inf'):
+            bucket_labels = ','.join(filter(None, (labels, f'le="{bound}"')))
+            yield f'{family}_bucket', bucket_labels, values.get(bound, 0)
+        for name in (f'{family}_sum', f'{family}_count'):
+            yield name, labels, values.get(name, 0)
+
+
+def exposition():
+    families = defaultdict(list)
+    for name, labels, value in (*store().samples(), *job_samples()):
+        families[family_of(name)].append((name, labels, value))
+    lines = []
+    for family, samples in families.items():
+        kind, description = FAMILIES.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        if kind == 'histogram':
+            samples = histogram_samples(family, samples)
+        lines.extend(sample_line(*sample) for sample in samples)
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = getattr(settings, 'BLOG_METRICS_TOKEN', None)
+    scheme, _, given = request.META.get(
+        'HTTP_AUTHORIZATION', ''
+    ).partition(' ')
+    if not (token and scheme.lower() == 'bearer'
+            and hmac.compare_digest(given.encode(), token.encode())):
+        raise Http404
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
@@ -0,0 +1,138 @@
+import logging
+import random
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics, profiling, timing
+
+logger = logging.getLogger('blog.timing')
+
+
+class FragmentCacheStatsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        stats = getattr(request, 'fragment_cache_stats', None)
+        if stats:
+            response['X-Fragment-Cache'] = (
+                f"hits={stats['hits']}, misses={stats['misses']}"
+            )
+        return response
+
+
+class ServerTimingMiddleware:
+    """Report DB, template and total time of ``blog``/``pages`` views.
+
+    Adds a ``Server-Timing`` header and one ``blog.timing`` log record
+    per request; the apps are set by ``BLOG_SERVER_TIMING_APPS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.apps = frozenset(
+            getattr(settings, 'BLOG_SERVER_TIMING_APPS', ('blog', 'pages'))
+        )
+
+    def __call__(self, request):
+        timings = request.timings = timing.RequestTimings()
+        token = timing.current.set(timings)
+        started = perf_counter()
+        try:
+            with connection.execute_wrapper(timings):
+                response = self.get_response(request)
+        finally:
+            timing.current.reset(token)
+        total = perf_counter() - started
+        match = request.resolver_match
+        if match is None or match.app_name not in self.apps:
+            return response
+        metrics = {
+            'db_queries': timings.queries,
+            'db_ms': round(timings.db_seconds * 1000, 2),
+            'render_ms': round(timings.render_seconds * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+        response['Server-Timing'] = (
+            f'db;dur={metrics["db_ms"]};desc="{timings.queries} queries", '
+            f'tpl;dur={metrics["render_ms"]}, '
+            f'total;dur={metrics["total_ms"]}'
+        )
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name,
+            'status': response.status_code,
+            **metrics,
+        }
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in record.items()),
+            extra={'timing': record}
+        )
+        return response
+
+
+class ProfilingMiddleware:
+    """Sample the stacks of a share of ``blog`` requests.
+
+    Off unless ``manage.py profiling on`` wrote a config; a profile is
+    kept only when the request took at least ``threshold_ms``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.apps = frozenset(
+            getattr(settings, 'BLOG_PROFILING_APPS', ('blog',))
+        )
+
+    def __call__(self, request):
+        config = profiling.read_config()
+        if config is None or random.random() >= config['sample_rate']:
+            return self.get_response(request)
+        ident = threading.get_ident()
+        sampler = profiling.sampler(config['interval_ms'])
+        samples = sampler.watch(ident)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.unwatch(ident)
+        elapsed_ms = (perf_counter() - started) * 1000
+        match = request.resolver_match
+        if (samples and match is not None and match.app_name in self.apps
+                and elapsed_ms >= config['threshold_ms']):
+            profiling.write_profile(request, match.view_name, elapsed_ms,
+                                    samples, config['keep'])
+        return response
+
+
+class MetricsMiddleware:
+    """Count requests, latency and SQL per resolved URL name.
+
+    Goes before ``ServerTimingMiddleware``, whose ``request.timings``
+    supplies the query count and time.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        response = self.get_response(request)
+        elapsed = perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match is not None else '<unresolved>'
+        metrics.inc('blog_http_requests_total', view=view,
+                    method=request.method, status=response.status_code)
+        metrics.observe('blog_http_request_duration_seconds', elapsed,
+                        view=view)
+        timings = getattr(request, 'timings', None)
+        if timings is not None:
+            metrics.inc('blog_db_queries_total', timings.queries, view=view)
+            metrics.inc('blog_db_query_duration_seconds_total',
+                        timings.db_seconds, view=view)
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Commentary = apps.get_model('blog', 'Commentary')
+    counts = Commentary.objects.filter(
+        post_id=OuterRef('pk')
+    ).order_by().values('post_id').annotate(total=Count('id')).values('total')
+    Post.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0007_auto_20240228_1305'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кол-во комментариев'),
+        ),
+        migrations.AlterField(
+            model_name='commentary',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='commentaries', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='commentary',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='commentaries', to='blog.post', verbose_name='Пост'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from blog.search import CREATE_SQL, FTS_TABLE
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    from blog.search import DROP_SQL
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Имя')),
+                ('reached_at', models.DateTimeField(verbose_name='Обработано до')),
+            ],
+            options={
+                'verbose_name': 'контрольная точка',
+                'verbose_name_plural': 'Контрольные точки',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('category', 'Категория'), ('author', 'Автор')], max_length=16, verbose_name='Разрез')),
+                ('key', models.PositiveIntegerField(verbose_name='id категории или автора')),
+                ('published', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций',
+                'verbose_name_plural': 'Счётчики публикаций',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'key'), name='post_counter_unique'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_front_page(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    FrontPageEntry = apps.get_model('blog', 'FrontPageEntry')
+    posts = Post.objects.filter(
+        is_visible=True, pub_date__lte=timezone.now()
+    ).select_related(
+        'author', 'category', 'location'
+    ).order_by('-pub_date', '-id')[
+        :getattr(settings, 'BLOG_FRONT_PAGE_SIZE', 100)
+    ]
+    entries = []
+    for post in posts:
+        category, location = post.category, post.location
+        visible_location = location is not None and location.is_published
+        entries.append(FrontPageEntry(
+            id=post.pk,
+            pub_date=post.pub_date,
+            title=post.title,
+            text=post.text,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            category_id=category.pk,
+            category_slug=category.slug,
+            category_title=category.title,
+            location_name=location.name if visible_location else '',
+            image=post.image.name or '',
+            image_variants=post.image_variants,
+            comment_count=post.comment_count,
+            updated_at=max(filter(None, (
+                post.updated_at, category.updated_at,
+                location and location.updated_at,
+            ))),
+        ))
+    FrontPageEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrontPageEntry',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Пост')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('author_id', models.BigIntegerField(verbose_name='Автор')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Имя автора')),
+                ('category_id', models.BigIntegerField(verbose_name='Категория')),
+                ('category_slug', models.CharField(max_length=50, verbose_name='Идентификатор категории')),
+                ('category_title', models.CharField(max_length=256, verbose_name='Название категории')),
+                ('location_name', models.CharField(blank=True, help_text='Пусто, если место не указано или снято с публикации.', max_length=256, verbose_name='Название места')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Фото')),
+                ('image_variants', models.JSONField(default=dict, verbose_name='Уменьшенные копии фото')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Кол-во комментариев')),
+                ('updated_at', models.DateTimeField(verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'пост главной страницы',
+                'verbose_name_plural': 'Посты главной страницы',
+                'ordering': ('-pub_date', '-id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='frontpageentry',
+            index=models.Index(fields=['-pub_date', '-id'], name='front_page_idx'),
+        ),
+        migrations.RunPython(fill_front_page, migrations.RunPython.noop),
+    ]
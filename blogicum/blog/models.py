@@ -1,5 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .images import ImageVariant, build_variants, delete_variants
 
 User = get_user_model()
 MX_CHARS = 256
@@ -15,6 +20,10 @@ class BaseModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -57,6 +66,43 @@ class Location(BaseModel):
         return self.name
 
 
+VISIBILITY_FIELDS = frozenset(['is_published', 'category', 'category_id'])
+
+
+def published_q(now=None):
+    """The rule that makes a post public as of ``now``.
+
+    ``is_visible`` stands in for the post and category flags, so the
+    check stays on ``blog_post``.
+    """
+    return Q(is_visible=True, pub_date__lte=now or timezone.now())
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self, now=None):
+        return self.filter(published_q(now))
+
+    def visible_to(self, user=None):
+        """Posts ``user`` may see, newest first, with their relations.
+
+        That is the public posts plus the user's own drafts.
+        ``location_visible`` and ``category_visible`` tell the templates
+        whether the place and the category are published.
+        """
+        visible = published_q()
+        if user is not None and user.is_authenticated:
+            visible |= Q(author_id=user.pk)
+        return self.filter(visible).with_relations()
+
+    def with_relations(self):
+        return self.select_related(
+            'category', 'author', 'location'
+        ).annotate(
+            location_visible=Coalesce('location__is_published', Value(False)),
+            category_visible=Coalesce('category__is_published', Value(False)),
+        ).order_by('-pub_date', '-id')
+
+
 class Post(BaseModel):
     title = models.CharField(
         max_length=MX_CHARS,
@@ -96,15 +142,103 @@ class Post(BaseModel):
         upload_to='post_images',
         blank=True
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Кол-во комментариев'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден читателям',
+        help_text='Пост и его категория опубликованы.'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or VISIBILITY_FIELDS & set(update_fields):
+            self.is_visible = (
+                self.is_published and self.category_id is not None
+                and Category.objects.filter(
+                    pk=self.category_id, is_published=True
+                ).exists()
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, 'is_visible'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def image_variant(self, name):
+        variant = self.image_variants.get(name)
+        return ImageVariant(**variant) if variant else None
+
+    @property
+    def card_image(self):
+        return self.image_variant('card')
+
+    @property
+    def detail_image(self):
+        return self.image_variant('detail')
+
+    @property
+    def image_placeholder(self):
+        return self.image_variant('placeholder')
+
+    @property
+    def image_srcset(self):
+        return ', '.join(
+            f'{variant.url} {variant.width}w'
+            for variant in map(self.image_variant, ('card', 'detail'))
+            if variant
+        )
+
+    def reset_image_variants(self):
+        """Forget the variants of a replaced image until they are rebuilt.
+
+        Call inside the transaction that saves the new image; the old
+        files are deleted once it commits.
+        """
+        old_variants, self.image_variants = self.image_variants, {}
+        transaction.on_commit(lambda: delete_variants(old_variants))
+
+    def refresh_image_variants(self):
+        # Pages keep linking the old files until the new ones are saved.
+        old_variants = self.image_variants
+        self.image_variants = build_variants(self.image) if self.image else {}
+        with transaction.atomic():
+            self.save(update_fields=['image_variants'])
+            transaction.on_commit(lambda: delete_variants(old_variants))
+
 
 class Commentary(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
@@ -127,3 +261,151 @@ class Commentary(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class PostCounter(models.Model):
+    CATEGORY = 'category'
+    AUTHOR = 'author'
+    SCOPES = (
+        (CATEGORY, 'Категория'),
+        (AUTHOR, 'Автор'),
+    )
+
+    scope = models.CharField(
+        max_length=16,
+        choices=SCOPES,
+        verbose_name='Разрез'
+    )
+    key = models.PositiveIntegerField(
+        verbose_name='id категории или автора'
+    )
+    published = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Опубликовано постов'
+    )
+
+    class Meta:
+        verbose_name = 'счётчик публикаций'
+        verbose_name_plural = 'Счётчики публикаций'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'key'], name='post_counter_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}:{self.key}={self.published}'
+
+
+class Checkpoint(models.Model):
+    name = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Имя'
+    )
+    reached_at = models.DateTimeField(
+        verbose_name='Обработано до'
+    )
+
+    class Meta:
+        verbose_name = 'контрольная точка'
+        verbose_name_plural = 'Контрольные точки'
+
+    def __str__(self):
+        return f'{self.name}: {self.reached_at}'
+
+
+class FrontPageEntry(models.Model):
+    """A homepage card of one of the newest visible posts.
+
+    Holds everything ``post_card`` renders, so the first homepage pages
+    are read from this table alone; ``blog.frontpage`` keeps it in sync.
+    """
+
+    id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата и время публикации'
+    )
+    title = models.CharField(
+        max_length=MX_CHARS,
+        verbose_name='Заголовок'
+    )
+    text = models.TextField(
+        verbose_name='Текст'
+    )
+    author_id = models.BigIntegerField(
+        verbose_name='Автор'
+    )
+    author_username = models.CharField(
+        max_length=150,
+        verbose_name='Имя автора'
+    )
+    category_id = models.BigIntegerField(
+        verbose_name='Категория'
+    )
+    category_slug = models.CharField(
+        max_length=50,
+        verbose_name='Идентификатор категории'
+    )
+    category_title = models.CharField(
+        max_length=MX_CHARS,
+        verbose_name='Название категории'
+    )
+    location_name = models.CharField(
+        max_length=MX_CHARS,
+        blank=True,
+        verbose_name='Название места',
+        help_text='Пусто, если место не указано или снято с публикации.'
+    )
+    image = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Фото'
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        verbose_name='Уменьшенные копии фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Кол-во комментариев'
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'пост главной страницы'
+        verbose_name_plural = 'Посты главной страницы'
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='front_page_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def as_post(self):
+        """An unsaved ``Post`` that renders like the one it came from."""
+        post = Post(
+            id=self.id, pub_date=self.pub_date, title=self.title,
+            text=self.text, image=self.image,
+            image_variants=self.image_variants,
+            comment_count=self.comment_count, updated_at=self.updated_at,
+            is_published=True, is_visible=True,
+        )
+        post.author = User(id=self.author_id, username=self.author_username)
+        post.category = Category(
+            id=self.category_id, slug=self.category_slug,
+            title=self.category_title, is_published=True,
+        )
+        post.location = Location(
+            name=self.location_name, is_published=True
+        ) if self.location_name else None
+        post.category_visible = True
+        post.location_visible = bool(self.location_name)
+        return post
@@ -0,0 +1,302 @@
+import base64
+import binascii
+import math
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+ELLIPSIS = '…'
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, number,
+                 has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def page_window(self):
+        return list(self.paginator.get_elided_page_range(self.number))
+
+    @cached_property
+    def page_links(self):
+        return self.paginator.page_links(self)
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(
+            self.object_list[-1], self.next_page_number())
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(
+            self.object_list[0], self.previous_page_number())
+
+
+class CursorPaginator:
+    """Keyset pagination over ``(pub_date, id)``, newest first.
+
+    Pages are addressed by opaque ``after``/``before`` tokens instead of
+    page numbers, so stepping through pages issues neither ``COUNT(*)``
+    nor ``OFFSET``. Subclasses can page on another key by overriding
+    ``ordering`` and the ``cursor_values``/``parse_cursor``/
+    ``filter_after``/``filter_before`` hooks.
+
+    ``count`` is an optional callable returning the (cached) total; with
+    it the paginator offers an elided window of numbered pages. Their
+    links are cursors too, found by a short seek from the current page,
+    from either end of the feed, whichever is nearest; a page further
+    than ``SEEK_PAGES`` pages from all of them gets no link.
+    """
+
+    ordering = ('-pub_date', '-id')
+    ELLIPSIS = ELLIPSIS
+    SEEK_PAGES = 4
+
+    def __init__(self, object_list, per_page, count=None):
+        self.object_list = object_list
+        self.per_page = per_page
+        self._count = count
+
+    @cached_property
+    def count(self):
+        return self._count() if self._count else None
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def get_elided_page_range(self, number, on_each_side=2, on_ends=1):
+        """Same window as ``Paginator.get_elided_page_range()``."""
+        if self.num_pages is None:
+            return
+        num_pages = max(self.num_pages, number)
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from range(1, num_pages + 1)
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+    def seek_queryset(self):
+        """Rows the page links are sought in, reduced to the cursor."""
+        return self.object_list.select_related(None).only(
+            *(field.lstrip('-') for field in self.ordering)
+        )
+
+    def seek(self, page, source, limit):
+        """Up to ``limit`` rows read from ``source`` outwards.
+
+        ``head`` and ``tail`` start at the newest and the oldest row,
+        ``forward`` and ``backward`` at the edges of ``page``.
+        """
+        queryset = self.seek_queryset()
+        if source == 'forward':
+            queryset = self.filter_after(queryset, *self.parse_cursor(
+                *self.cursor_values(page.object_list[-1])
+            ))
+        elif source == 'backward':
+            queryset = self.filter_before(queryset, *self.parse_cursor(
+                *self.cursor_values(page.object_list[0])
+            ))
+        ordering = (self.reverse_ordering
+                    if source in ('backward', 'tail') else self.ordering)
+        return list(queryset.order_by(*ordering)[:limit])
+
+    def page_links(self, page):
+        """``(number, query)`` for every entry of the page window.
+
+        ``query`` is the query string of the link, None for the current
+        page and the ellipses. A page ``n`` starts right after the row
+        that ends page ``n - 1``, which is looked up by the cheapest seek:
+        ``plans`` maps ``n`` to the source and the index of that row in
+        it, -1 standing for a row of ``page`` itself.
+        """
+        if not page.object_list:
+            return []
+        per_page, current = self.per_page, page.number
+        plans = {}
+        numbers = list(self.get_elided_page_range(current))
+        for number in numbers:
+            if number in (ELLIPSIS, current, 1):
+                continue
+            options = [('head', (number - 1) * per_page - 1)]
+            if number > current:
+                options.append(
+                    ('forward', (number - current - 1) * per_page - 1)
+                )
+            else:
+                options.append(
+                    ('backward', (current - number - 1) * per_page - 1)
+                )
+            if self.count is not None:
+                options.append(('tail', self.count - (number - 1) * per_page))
+            source, index = min(options, key=lambda option: option[1])
+            if index < self.SEEK_PAGES * per_page:
+                plans[number] = source, index
+        rows = {
+            source: self.seek(page, source, limit + 1)
+            for source, limit in (
+                (source, max(index for used, index in plans.values()
+                             if used == source))
+                for source in {source for source, _ in plans.values()}
+            )
+            if limit >= 0
+        }
+        links = []
+        for number in numbers:
+            if number in (ELLIPSIS, current):
+                links.append((number, None))
+            elif number == 1:
+                links.append((number, ''))
+            elif number in plans:
+                source, index = plans[number]
+                if index < 0:
+                    row = page.object_list[
+                        -1 if source == 'forward' else 0
+                    ]
+                elif index < len(rows[source]):
+                    row = rows[source][index]
+                else:
+                    continue
+                name = 'before' if source == 'backward' else 'after'
+                links.append(
+                    (number, f'{name}={self.encode_cursor(row, number)}')
+                )
+        return links
+
+    @property
+    def reverse_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def cursor_values(self, obj):
+        return obj.pub_date.isoformat(), obj.pk
+
+    def parse_cursor(self, pub_date, pk):
+        return datetime.fromisoformat(pub_date), int(pk)
+
+    def filter_after(self, queryset, pub_date, pk):
+        return queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+        )
+
+    def filter_before(self, queryset, pub_date, pk):
+        return queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+        )
+
+    def encode_cursor(self, obj, number):
+        raw = '|'.join(map(str, (*self.cursor_values(obj), number)))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            *values, number = raw.split('|')
+            return self.parse_cursor(*values), int(number)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            return None
+
+    def first_page(self):
+        rows = list(self.object_list.order_by(
+            *self.ordering)[:self.per_page + 1])
+        return CursorPage(rows[:self.per_page], self, 1,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=False)
+
+    def page_after(self, values, number):
+        rows = list(self.filter_after(
+            self.object_list, *values
+        ).order_by(*self.ordering)[:self.per_page + 1])
+        return CursorPage(rows[:self.per_page], self, number,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=True)
+
+    def page_before(self, values, number):
+        rows = list(self.filter_before(
+            self.object_list, *values
+        ).order_by(*self.reverse_ordering)[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if len(rows) < self.per_page:
+            return self.first_page()
+        rows.reverse()
+        return CursorPage(rows, self, max(number, 2) if has_previous else 1,
+                          has_next=True,
+                          has_previous=has_previous)
+
+    def get_page(self, after=None, before=None):
+        cursor = after and self.decode_cursor(after)
+        if cursor:
+            return self.page_after(*cursor) or self.first_page()
+        cursor = before and self.decode_cursor(before)
+        if cursor:
+            return self.page_before(*cursor)
+        return self.first_page()
+
+
+class CommentPaginator(CursorPaginator):
+    ordering = ('created_at', 'id')
+
+    def cursor_values(self, obj):
+        return obj.created_at.isoformat(), obj.pk
+
+    def filter_after(self, queryset, created_at, pk):
+        return queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        )
+
+    def filter_before(self, queryset, created_at, pk):
+        return queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
@@ -0,0 +1,208 @@
+"""Stack-sampling profiler for slow requests.
+
+One daemon thread snapshots the stacks of the requests being profiled
+every ``interval_ms``. Frames of ``Template.render`` and of
+``QuerySet._fetch_all`` are labelled with the template name and the
+model, so the hot include or queryset shows up in the stack itself.
+
+Profiles are written as folded stacks (``a;b;c count``), which
+``flamegraph.pl``, speedscope and inferno load as is, plus a ``.txt``
+summary. The switch is a JSON file in ``BLOG_PROFILING_DIR`` managed by
+``manage.py profiling``; it is re-read when its mtime changes, so
+profiling is turned on and off without a restart.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+CONFIG_NAME = 'profiling.json'
+DEFAULTS = {
+    'sample_rate': 1.0,
+    'threshold_ms': 0,
+    'interval_ms': 5,
+    'keep': 100,
+}
+PROJECT_MODULES = ('blog', 'pages', 'jobs', 'blogicum')
+SUMMARY_TOP = 15
+
+
+def profile_dir():
+    return Path(getattr(settings, 'BLOG_PROFILING_DIR',
+                        settings.BASE_DIR / 'profiles'))
+
+
+def write_config(config):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / CONFIG_NAME
+    if config is None:
+        path.unlink(missing_ok=True)
+        return
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps({**DEFAULTS, **config}))
+    os.replace(temporary, path)
+
+
+_config_cache = {'mtime': None, 'config': None}
+
+
+def read_config():
+    """Return the active profiling config, or ``None`` when it is off."""
+    path = profile_dir() / CONFIG_NAME
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _config_cache.update(mtime=None, config=None)
+        return None
+    if mtime != _config_cache['mtime']:
+        try:
+            config = {**DEFAULTS, **json.loads(path.read_text())}
+        except ValueError:
+            config = None
+        _config_cache.update(mtime=mtime, config=config)
+    return _config_cache['config']
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    if module == 'django.template.base' and code.co_name == 'render':
+        origin = getattr(frame.f_locals.get('self'), 'origin', None)
+        if origin is not None:
+            return f'template:{origin.template_name or origin.name}'
+    if (module == 'django.db.models.query'
+            and code.co_name == '_fetch_all'):
+        queryset = frame.f_locals.get('self')
+        if queryset is not None:
+            return f'queryset:{queryset.model.__name__}'
+    return f'{module}:{code.co_name}'
+
+
+def fold(frame):
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class StackSampler(threading.Thread):
+    def __init__(self):
+        super().__init__(name='blog-profiler', daemon=True)
+        self.interval = DEFAULTS['interval_ms'] / 1000
+        self.targets = {}
+        self.lock = threading.Lock()
+
+    def watch(self, ident):
+        samples = Counter()
+        with self.lock:
+            self.targets[ident] = samples
+        return samples
+
+    def unwatch(self, ident):
+        with self.lock:
+            self.targets.pop(ident, None)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.targets:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self.targets.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[fold(frame)] += 1
+            del frames
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def sampler(interval_ms):
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler()
+            _sampler.start()
+    _sampler.interval = interval_ms / 1000
+    return _sampler
+
+
+def innermost(stack, prefixes):
+    for label in reversed(stack.split(';')):
+        if label.startswith(prefixes):
+            return label
+    return None
+
+
+def compact(stack, project):
+    return ' > '.join(
+        label for label in stack.split(';')
+        if label.startswith(('template:', 'queryset:', *project))
+    ) or stack.rsplit(';', 1)[-1]
+
+
+def summary(samples, header):
+    total = sum(samples.values())
+    lines = [*header, f'samples={total}', '']
+
+    def section(title, counter):
+        lines.append(title)
+        for label, count in counter.most_common(SUMMARY_TOP):
+            lines.append(f'{count / total:7.1%}  {label}')
+        lines.append('')
+
+    by_kind = {'template:': Counter(), 'queryset:': Counter(),
+               'code:': Counter()}
+    project = tuple(f'{module}.' for module in PROJECT_MODULES)
+    for stack, count in samples.items():
+        for prefix in ('template:', 'queryset:'):
+            label = innermost(stack, prefix)
+            if label:
+                by_kind[prefix][label] += count
+        label = innermost(stack, project)
+        if label:
+            by_kind['code:'][label] += count
+    section('Шаблоны (включая вложенные):', by_kind['template:'])
+    section('QuerySet:', by_kind['queryset:'])
+    section('Код проекта:', by_kind['code:'])
+    stacks = Counter()
+    for stack, count in samples.items():
+        stacks[compact(stack, project)] += count
+    section('Стеки (только код проекта, шаблоны и QuerySet):', stacks)
+    return '\n'.join(lines)
+
+
+def rotate(directory, keep):
+    profiles = sorted(directory.glob('*.folded'))
+    for stale in profiles[:max(len(profiles) - keep, 0)]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.txt').unlink(missing_ok=True)
+
+
+def write_profile(request, view_name, elapsed_ms, samples, keep):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    stem = f'{stamp}-{view_name.replace(":", "-")}'
+    folded = '\n'.join(
+        f'{stack} {count}' for stack, count in samples.most_common()
+    )
+    (directory / f'{stem}.folded').write_text(folded + '\n')
+    (directory / f'{stem}.txt').write_text(summary(samples, (
+        f'{request.method} {request.get_full_path()}',
+        f'view={view_name} total_ms={elapsed_ms:.1f}',
+    )) + '\n')
+    rotate(directory, keep)
+    return directory / f'{stem}.folded'
@@ -0,0 +1,118 @@
+"""Promotion of posts with a future ``pub_date``.
+
+Saving such a post queues ``blog.publish_scheduled`` for its
+``pub_date`` unless an earlier run is queued already; every run queues
+the next one. The task, or ``manage.py publish_scheduled`` after
+downtime, walks the posts that came due since the ``scheduled_posts``
+checkpoint in ``pub_date`` order, one batch at a time. Each batch counts
+its posts, adds them to the homepage window and invalidates their pages
+and feeds once. The checkpoint is moved by compare-and-swap inside the
+batch transaction, so a post is handled exactly once however many
+workers run.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import schedule
+
+from . import counters, frontpage
+from .cache import (PUBLISHED_SCOPE, invalidate, post_scopes,
+                    syndication_scopes)
+from .models import Checkpoint, Post
+
+CHECKPOINT = 'scheduled_posts'
+TASK = 'blog.publish_scheduled'
+BATCH_SIZE = 500
+
+
+def ensure_checkpoint(now=None):
+    """Start the checkpoint at ``now`` unless it exists already."""
+    Checkpoint.objects.get_or_create(
+        name=CHECKPOINT, defaults={'reached_at': now or timezone.now()}
+    )
+
+
+def checkpoint():
+    return Checkpoint.objects.filter(
+        name=CHECKPOINT
+    ).values_list('reached_at', flat=True).first()
+
+
+def plan(run_after):
+    """Make sure a run is queued no later than ``run_after``."""
+    ensure_checkpoint()
+    queued = Job.objects.filter(
+        task=TASK, status=Job.PENDING, run_after__lte=run_after
+    ).exists()
+    if not queued:
+        schedule(TASK, run_after)
+
+
+def plan_next(now=None):
+    """Queue a run for the next scheduled post, if there is one."""
+    upcoming = Post.objects.filter(
+        is_visible=True, pub_date__gt=now or timezone.now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if upcoming is not None:
+        plan(upcoming)
+
+
+def due_posts(since, until):
+    return Post.objects.filter(
+        is_visible=True, pub_date__gt=since, pub_date__lte=until
+    ).order_by('pub_date', 'id')
+
+
+def batch_scopes(rows):
+    scopes = {PUBLISHED_SCOPE}
+    for row in rows:
+        slug = row['category__slug']
+        scopes.update(post_scopes(row['id'], slug))
+        scopes.update(syndication_scopes(row['author__username'], slug))
+    return scopes
+
+
+@transaction.atomic
+def publish_batch(now, batch_size=BATCH_SIZE):
+    """Promote the next batch of due posts.
+
+    Returns ``(posts, done)``. A batch ends on a ``pub_date`` boundary,
+    so posts sharing the last ``pub_date`` are all in it.
+    """
+    since = checkpoint()
+    if since is None:
+        ensure_checkpoint(now)
+        return 0, True
+    if since >= now:
+        return 0, True
+    due = due_posts(since, now)
+    last = list(due.values_list('pub_date', flat=True)[
+        batch_size - 1:batch_size
+    ])
+    upper = last[0] if last else now
+    rows = list(due.filter(pub_date__lte=upper).values(
+        'id', 'category__slug', 'author__username'
+    ))
+    moved = Checkpoint.objects.filter(
+        name=CHECKPOINT, reached_at=since
+    ).update(reached_at=upper)
+    if not moved:
+        return 0, True
+    counters.advance(upper)
+    if rows:
+        frontpage.sync(*(row['id'] for row in rows))
+        scopes = batch_scopes(rows)
+        transaction.on_commit(lambda: invalidate(*scopes))
+    return len(rows), upper >= now
+
+
+def publish_due(now=None, batch_size=BATCH_SIZE):
+    """Promote every post that came due by ``now``; return how many."""
+    now = now or timezone.now()
+    published = 0
+    done = False
+    while not done:
+        posts, done = publish_batch(now, batch_size)
+        published += posts
+    return published
@@ -0,0 +1,101 @@
+import re
+
+from django.db import connection, connections
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .paginators import CursorPaginator
+
+FTS_TABLE = 'blog_post_fts'
+RANK_SQL = f'bm25({FTS_TABLE}, 10.0, 1.0)'
+SNIPPET_SQL = f"snippet({FTS_TABLE}, 1, char(2), char(3), '…', 16)"
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON blog_post '
+    f'BEGIN INSERT INTO {FTS_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON blog_post '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au '
+    'AFTER UPDATE OF title, text ON blog_post '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); "
+    f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def search_supported():
+    return connection.vendor == 'sqlite'
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # SQLite migrations that alter blog_post rebuild the table and drop
+    # its triggers, so they are recreated after every migrate.
+    target = connections[using]
+    if target.vendor != 'sqlite':
+        return
+    with target.cursor() as cursor:
+        for statement in CREATE_SQL:
+            cursor.execute(statement)
+
+
+def fts_query(text):
+    """Turn free user input into a safe FTS5 prefix query."""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_posts(queryset, text):
+    query = fts_query(text)
+    if not query or not search_supported():
+        return queryset.none()
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = blog_post.id', f'{FTS_TABLE} MATCH %s'],
+        params=[query],
+        select={'rank': RANK_SQL, 'snippet': SNIPPET_SQL},
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_OPEN, '<mark>')
+        .replace(MARK_CLOSE, '</mark>')
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    ordering = ('rank', 'id')
+
+    def cursor_values(self, obj):
+        return repr(obj.rank), obj.pk
+
+    def parse_cursor(self, rank, pk):
+        return float(rank), int(pk)
+
+    def filter_after(self, queryset, rank, pk):
+        return queryset.extra(
+            where=[f'({RANK_SQL} > %s OR ({RANK_SQL} = %s '
+                   'AND blog_post.id > %s))'],
+            params=[rank, rank, pk],
+        )
+
+    def filter_before(self, queryset, rank, pk):
+        return queryset.extra(
+            where=[f'({RANK_SQL} < %s OR ({RANK_SQL} = %s '
+                   'AND blog_post.id < %s))'],
+            params=[rank, rank, pk],
+        )
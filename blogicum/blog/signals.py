@@ -0,0 +1,189 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, frontpage, scheduling, visibility
+from .cache import (POST_SCOPE, PUBLISHED_SCOPE, TAXONOMY_SCOPE, invalidate,
+                    post_scopes, syndication_scopes)
+from .models import (Category, Commentary, FrontPageEntry, Location, Post,
+                     PostCounter)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Commentary)
+def touch_post_on_comment_save(sender, instance, created, **kwargs):
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    FrontPageEntry.objects.filter(id=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Commentary)
+def touch_post_on_comment_delete(sender, instance, **kwargs):
+    changes = {
+        'comment_count': Greatest(F('comment_count') - 1, 0),
+        'updated_at': timezone.now(),
+    }
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    FrontPageEntry.objects.filter(id=instance.post_id).update(**changes)
+
+
+COUNTED_FIELDS = frozenset(['is_published', 'pub_date', 'category',
+                            'author'])
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, update_fields=None, **kwargs):
+    instance._old_category_slug = None
+    instance._counters_at = None
+    if update_fields is not None and not COUNTED_FIELDS & update_fields:
+        return
+    instance._counters_at = counters.reached()
+    old = counters.post_values(instance.pk) if instance.pk else None
+    instance._old_category_slug = old and old['category__slug']
+    instance._old_counted = counters.counted_key(old, instance._counters_at)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, **kwargs):
+    if instance._counters_at is None:
+        return
+    new = counters.counted_key(
+        counters.post_values(instance.pk), instance._counters_at
+    )
+    if new != instance._old_counted:
+        counters.add_post(instance._old_counted, -1)
+        counters.add_post(new, 1)
+
+
+@receiver(post_save, sender=Post)
+def schedule_future_post(sender, instance, **kwargs):
+    if (instance._counters_at is not None and instance.is_visible
+            and instance.pub_date > timezone.now()):
+        scheduling.plan(instance.pub_date)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs):
+    instance._old_counted = counters.counted_key(
+        counters.post_values(instance.pk), counters.reached()
+    )
+
+
+@receiver(post_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    counters.add_post(instance._old_counted, -1)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    instance._was_published = Category.objects.filter(
+        pk=instance.pk
+    ).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def recount_republished_category(sender, instance, created, **kwargs):
+    if not created and instance._was_published != instance.is_published:
+        visibility.set_category_visibility(instance.pk, instance.is_published)
+        counters.recount_category(instance.pk)
+        scheduling.plan_next()
+        frontpage.rebuild()
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_authors(sender, instance, **kwargs):
+    instance._author_ids = set(Post.objects.filter(
+        category_id=instance.pk
+    ).values_list('author_id', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Category)
+def hide_deleted_category_posts(sender, instance, **kwargs):
+    visibility.set_category_visibility(instance.pk, False)
+
+
+@receiver(post_delete, sender=Category)
+def recount_deleted_category(sender, instance, **kwargs):
+    counters.recount_category(instance.pk, instance._author_ids)
+    PostCounter.objects.filter(
+        scope=PostCounter.CATEGORY, key=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=User)
+def drop_author_counter(sender, instance, **kwargs):
+    PostCounter.objects.filter(
+        scope=PostCounter.AUTHOR, key=instance.pk
+    ).delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def sync_front_page(sender, instance, **kwargs):
+    frontpage.sync(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    category_slugs = (
+        instance.category.slug if instance.category else None,
+        getattr(instance, '_old_category_slug', None),
+    )
+    invalidate(
+        PUBLISHED_SCOPE,
+        *post_scopes(instance.pk, *category_slugs),
+        *syndication_scopes(instance.author.username, *category_slugs)
+    )
+
+
+@receiver(post_save, sender=Commentary)
+@receiver(post_delete, sender=Commentary)
+def invalidate_comment_pages(sender, instance, created=True, **kwargs):
+    if not created:
+        invalidate(POST_SCOPE.format(post_id=instance.post_id))
+        return
+    category_slug = Post.objects.filter(
+        pk=instance.post_id
+    ).values_list('category__slug', flat=True).first()
+    invalidate(*post_scopes(instance.post_id, category_slug))
+
+
+@receiver(post_save, sender=Category)
+def rename_front_page_category(sender, instance, **kwargs):
+    frontpage.rename_category(instance)
+
+
+@receiver(post_save, sender=Location)
+def rename_front_page_location(sender, instance, **kwargs):
+    frontpage.rename_location(instance)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def rebuild_front_page(sender, instance, **kwargs):
+    frontpage.rebuild()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_taxonomy_pages(sender, instance, **kwargs):
+    invalidate(TAXONOMY_SCOPE)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, update_fields,
+                            **kwargs):
+    if created or update_fields == frozenset(['last_login']):
+        return
+    frontpage.rename_author(instance)
+    invalidate(TAXONOMY_SCOPE)
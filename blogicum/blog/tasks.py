@@ -0,0 +1,20 @@
+from django.utils import timezone
+
+from jobs.registry import task
+
+from . import scheduling
+from .models import Post
+
+
+@task('blog.build_image_variants')
+def build_image_variants(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        post.refresh_image_variants()
+
+
+@task('blog.publish_scheduled')
+def publish_scheduled():
+    now = timezone.now()
+    scheduling.publish_due(now)
+    scheduling.plan_next(now)
@@ -0,0 +1,57 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from blog import metrics
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def card_version(post):
+    category = post.category
+    location = post.location
+    parts = (
+        post.title, post.text, post.pub_date, post.is_published,
+        post.image.name, post.image_variants, post.comment_count,
+        post.author.username,
+        category and (category.title, category.slug, category.is_published),
+        location and (location.name, location.is_published),
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def count_fragment(request, stat):
+    metrics.inc('blog_cache_requests_total', cache='fragment',
+                result=metrics.CACHE_RESULTS[stat])
+    if request is None:
+        return
+    if not hasattr(request, 'fragment_cache_stats'):
+        request.fragment_cache_stats = {'hits': 0, 'misses': 0}
+    request.fragment_cache_stats[stat] += 1
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    request = context.get('request')
+    enabled = getattr(settings, 'BLOG_FRAGMENT_CACHE', True)
+    key = f'blog:card:{post.pk}:{card_version(post)}'
+    if enabled:
+        html = cache.get(key)
+        if html is not None:
+            count_fragment(request, 'hits')
+            return mark_safe(html)
+    count_fragment(request, 'misses')
+    with context.push(post=post):
+        html = context.template.engine.get_template(
+            CARD_TEMPLATE
+        ).render(context)
+    if enabled:
+        cache.set(
+            key, html, getattr(settings, 'BLOG_FRAGMENT_CACHE_TIMEOUT', 3600)
+        )
+    return mark_safe(html)
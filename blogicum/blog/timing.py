@@ -0,0 +1,64 @@
+"""Per-request timings for the ``Server-Timing`` header.
+
+``ServerTimingMiddleware`` puts a ``RequestTimings`` into ``current``
+for the duration of a request; the query wrapper and the template
+backend below add to it only while one is set.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+current = ContextVar('blog_request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self._render_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += perf_counter() - started
+
+    @contextmanager
+    def rendering(self):
+        """Time the outermost render only; includes are already in it."""
+        self._render_depth += 1
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._render_depth -= 1
+            if not self._render_depth:
+                self.render_seconds += perf_counter() - started
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current.get()
+        if timings is None:
+            return super().render(context, request)
+        with timings.rendering():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,123 @@
+"""JSONL dump format shared by ``export_blog`` and ``import_blog``.
+
+A dump is one JSON object per line, tagged with ``type``. Categories and
+locations come first, then posts, then comments, so a reader only ever
+refers back to rows it has already seen. Posts and comments keep their
+primary keys, which lets comments point at their post without an id map.
+Locations keep theirs too, since their names need not be unique; posts
+refer to them by id.
+"""
+import base64
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+CATEGORY_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'is_published': 'is_published',
+    'created_at': 'created_at',
+}
+LOCATION_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'is_published': 'is_published',
+    'created_at': 'created_at',
+}
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'is_published': 'is_published',
+    'created_at': 'created_at',
+    'comment_count': 'comment_count',
+    'image': 'image',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location_id',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+RECORD_TYPES = ('category', 'location', 'post', 'comment')
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """Keep microseconds, which ``DjangoJSONEncoder`` rounds away."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def read_image(name):
+    if not name:
+        return None
+    with default_storage.open(name, 'rb') as image:
+        content = base64.b64encode(image.read()).decode()
+    return {'name': name, 'content': content}
+
+
+def write_image(image):
+    if not image:
+        return ''
+    if not image.get('content'):
+        return image['name']
+    return default_storage.save(
+        image['name'], ContentFile(base64.b64decode(image['content']))
+    )
+
+
+@contextmanager
+def keep_created_at(*models):
+    """Let ``bulk_create`` write ``created_at`` from the dump.
+
+    ``auto_now_add`` would otherwise stamp every imported row with the
+    time of the import, which reorders comment threads.
+    """
+    fields = [model._meta.get_field('created_at') for model in models]
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in zip(fields, saved):
+            field.auto_now_add = auto_now_add
+
+
+class Throughput:
+    def __init__(self):
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def add(self, rows):
+        self.rows += rows
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        return f'{self.rows} строк, {self.rate:.0f} строк/с'
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
 
-from . import views
+from . import api, feeds, views
 
 static_img = static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
@@ -11,6 +11,8 @@ app_name = 'blog'
 post_urls = [
     path('<int:post_id>/', views.detail,
          name='post_detail'),
+    path('<int:post_id>/comments/', views.comment_list,
+         name='comment_list'),
     path('<int:post_id>/comment', views.create_comment,
          name='comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -26,8 +28,35 @@ post_urls = [
          name='delete_post'),
 ]
 
+feed_urls = [
+    path('rss/', feeds.latest_rss, name='feed_rss'),
+    path('atom/', feeds.latest_atom, name='feed_atom'),
+    path('category/<slug:category_slug>/rss/', feeds.category_rss,
+         name='category_feed_rss'),
+    path('category/<slug:category_slug>/atom/', feeds.category_atom,
+         name='category_feed_atom'),
+    path('profile/<str:username>/rss/', feeds.author_rss,
+         name='profile_feed_rss'),
+    path('profile/<str:username>/atom/', feeds.author_atom,
+         name='profile_feed_atom'),
+]
+
+api_urls = [
+    path('posts/', api.post_list, name='api_post_list'),
+    path('posts/export/', api.post_export, name='api_post_export'),
+    path('posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('posts/<int:post_id>/comments/', api.comment_list,
+         name='api_comment_list'),
+    path('comments/export/', api.comment_export,
+         name='api_comment_export'),
+    path('categories/', api.category_list, name='api_category_list'),
+]
+
 urlpatterns = [path('', views.homepage, name='homepage'),
                path('posts/', include(post_urls)),
+               path('search/', views.search, name='search'),
+               path('feeds/', include(feed_urls)),
+               path('api/v1/', include(api_urls)),
                path('category/<slug:category_slug>/', views.category,
                     name='category_posts'),
                path('profile/<str:username>/', views.profile_view,
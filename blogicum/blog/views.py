@@ -1,49 +1,49 @@
+from functools import partial
+
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db import transaction
 from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
-from django.utils import timezone
 
+from jobs.registry import enqueue
+
+from . import counters, frontpage
+from .cache import (CATEGORY_SCOPE, FEED_SCOPE, POST_SCOPE, TAXONOMY_SCOPE,
+                    cache_anonymous_page, cached_count)
+from .conditional import (conditional_page, feed_validators, page_validators,
+                          post_validators)
 from .forms import UserProfileForm, CommentaryForm, PostForm
 from .models import Category, Post, Commentary
+from .paginators import CommentPaginator, CursorPaginator
+from .search import SearchPaginator, highlight, search_posts
 
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
 
 
-def base_queryset(comment_count=False, filtration=False):
-    queryset = Post.objects.select_related(
-        'category',
-        'author',
-        'location').order_by('-pub_date')
-    if filtration:
-        queryset = queryset.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
-        )
-    if comment_count:
-        queryset = queryset.annotate(comment_count=Count('commentaries'))
-    return queryset
-
-
-def post_paginator(request, context_posts, page_count=POSTS_PER_PAGE):
-    paginator = Paginator(context_posts, page_count)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+def post_paginator(request, context_posts, count,
+                   page_count=POSTS_PER_PAGE):
+    paginator = CursorPaginator(context_posts, page_count, count=count)
+    page_obj = paginator.get_page(after=request.GET.get('after'),
+                                  before=request.GET.get('before'))
     return page_obj
 
 
 def profile_view(request, username):
     profile = get_object_or_404(User, username=username)
     user = request.user
-    context_posts = base_queryset(
-        comment_count=True,
-        filtration=profile != user
-    ).filter(author_id=profile.pk)
-    page_obj = post_paginator(request, context_posts)
+    context_posts = Post.objects.visible_to(user).filter(
+        author_id=profile.pk
+    )
+    if profile != user:
+        count = partial(counters.author_count, profile.pk)
+    else:
+        count = partial(
+            cached_count, f'profile:{profile.pk}', context_posts
+        )
+    page_obj = post_paginator(request, context_posts, count)
     context = {
         'user': user,
         'page_obj': page_obj,
@@ -68,48 +68,141 @@ def edit_profile(request):
     return render(request, template, context)
 
 
+def homepage_page(request):
+    """The homepage page, from the front-page window where it holds it.
+
+    Computed once per request: the validators and the view share it.
+    """
+    if not hasattr(request, '_blog_page'):
+        request._blog_page = frontpage.get_page(
+            request, POSTS_PER_PAGE, counters.total_count
+        ) or post_paginator(
+            request, Post.objects.visible_to(), counters.total_count
+        )
+    return request._blog_page
+
+
+def homepage_validators(request):
+    return page_validators(request, homepage_page(request))
+
+
+@cache_anonymous_page(FEED_SCOPE, TAXONOMY_SCOPE)
+@conditional_page(homepage_validators)
 def homepage(request):
-    page_obj = post_paginator(request, base_queryset(comment_count=True,
-                                                     filtration=True))
     template = 'blog/homepage.html'
-    context = {'page_obj': page_obj}
+    context = {'page_obj': homepage_page(request)}
     return render(request, template, context)
 
 
-def detail(request, post_id):
-    post = get_object_or_404(
-        Post,
-        pk=post_id
+def load_post(request, post_id):
+    """Fetch a visible post with its author, category and location.
+
+    One query per request: the validators and the view share the result.
+    """
+    if not hasattr(request, '_blog_post'):
+        request._blog_post = Post.objects.visible_to(request.user).filter(
+            pk=post_id
+        ).first()
+    if request._blog_post is None:
+        raise Http404
+    return request._blog_post
+
+
+def comments_open(post):
+    return post.is_published and post.category_visible
+
+
+def comment_paginator(post):
+    return CommentPaginator(
+        Commentary.objects.filter(post_id=post.pk).select_related('author'),
+        COMMENTS_PER_PAGE
     )
+
+
+def detail_validators(request, post_id):
+    try:
+        post = load_post(request, post_id)
+    except Http404:
+        return None
+    return post_validators(request, post)
+
+
+@cache_anonymous_page(POST_SCOPE, TAXONOMY_SCOPE)
+@conditional_page(detail_validators)
+def detail(request, post_id):
+    post = load_post(request, post_id)
     form = CommentaryForm()
-    comments = post.commentaries.all().select_related(
-        'author'
-    ).order_by(
-        'created_at'
-    )
-    if not ((post.is_published and post.category.is_published
-             and post.pub_date <= timezone.now())
-            or post.author == request.user):
-        raise Http404
+    comments = None
+    if comments_open(post):
+        comments = comment_paginator(post).first_page()
     template = 'blog/detail.html'
     context = {'post': post, 'form': form, 'comments': comments}
     return render(request, template, context)
 
 
+@cache_anonymous_page(POST_SCOPE, TAXONOMY_SCOPE)
+def comment_list(request, post_id):
+    post = load_post(request, post_id)
+    if not comments_open(post):
+        raise Http404
+    paginator = comment_paginator(post)
+    cursor = paginator.decode_cursor(request.GET.get('after', ''))
+    if cursor is None:
+        raise Http404
+    comments = paginator.page_after(*cursor)
+    template = 'includes/comment_list.html'
+    context = {'post': post, 'comments': comments}
+    return render(request, template, context)
+
+
+def category_validators(request, category_slug):
+    category_obj = Category.objects.filter(
+        slug=category_slug, is_published=True
+    ).values('id', 'updated_at').first()
+    if category_obj is None:
+        return None
+    return feed_validators(
+        request,
+        Post.objects.visible_to().filter(category_id=category_obj['id']),
+        POSTS_PER_PAGE,
+        partial(counters.category_count, category_obj['id']),
+        extra=(category_obj['updated_at'],)
+    )
+
+
+@cache_anonymous_page(CATEGORY_SCOPE, TAXONOMY_SCOPE)
+@conditional_page(category_validators)
 def category(request, category_slug):
     category_obj = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True)
-    context_posts = base_queryset(
-        filtration=True
-    ).filter(category_id=category_obj.pk)
-    page_obj = post_paginator(request, context_posts)
+    context_posts = Post.objects.visible_to().filter(
+        category_id=category_obj.pk
+    )
+    page_obj = post_paginator(
+        request, context_posts,
+        partial(counters.category_count, category_obj.pk)
+    )
     template = 'blog/category.html'
     context = {'page_obj': page_obj, 'category': category_obj}
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    results = search_posts(Post.objects.visible_to(), query)
+    page_obj = SearchPaginator(results, POSTS_PER_PAGE).get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before')
+    )
+    for post in page_obj:
+        post.snippet_html = highlight(post.snippet)
+    template = 'blog/search.html'
+    context = {'page_obj': page_obj, 'query': query}
+    return render(request, template, context)
+
+
 @login_required
 def create_post(request):
     form = PostForm(request.POST or None,
@@ -117,7 +210,10 @@ def create_post(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with transaction.atomic():
+            post.save()
+            if 'image' in form.changed_data:
+                enqueue('blog.build_image_variants', post_id=post.pk)
         return redirect('blog:profile', username=request.user.username)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -132,7 +228,12 @@ def edit_post(request, post_id):
                     files=request.FILES or None,
                     instance=post)
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            if 'image' in form.changed_data:
+                post.reset_image_variants()
+            form.save()
+            if 'image' in form.changed_data:
+                enqueue('blog.build_image_variants', post_id=post.pk)
         return redirect('blog:profile', username=request.user.username)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -152,14 +253,14 @@ def delete_post(request, post_id):
 
 @login_required
 def create_comment(request, post_id):
-    post = get_object_or_404(base_queryset(filtration=True), pk=post_id)
+    post = get_object_or_404(Post.objects.visible_to(), pk=post_id)
     form = CommentaryForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
-        post.save()
+        with transaction.atomic():
+            comment.save()
         return redirect('blog:post_detail', post_id=post_id)
     context = {'form': form}
     return render(request, 'blog/comment.html', context)
@@ -183,7 +284,8 @@ def delete_comment(request, post_id, comment_id):
                                 author=request.user.id,
                                 post_id=post_id)
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect('blog:post_detail', post_id=post_id)
     context = {'comment': comment}
     return render(request, 'blog/comment.html', context)
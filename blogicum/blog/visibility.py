@@ -0,0 +1,40 @@
+"""The denormalized ``Post.is_visible`` flag.
+
+``Post.save()`` sets the flag from the post and its category; category
+changes reach their posts through ``set_category_visibility()``. Writes
+that skip both (bulk imports, raw SQL) should finish with ``repair()``.
+"""
+from django.db.models import Q
+
+from .models import Post
+
+EXPECTED = Q(is_published=True, category__is_published=True)
+
+
+def set_category_visibility(category_id, visible):
+    """Show or hide the published posts of a category in one UPDATE."""
+    return Post.objects.filter(
+        category_id=category_id, is_published=True
+    ).exclude(is_visible=visible).update(is_visible=visible)
+
+
+def drifted(visible):
+    """Posts that should have ``is_visible=visible`` but do not."""
+    posts = Post.objects.filter(is_visible=not visible)
+    return posts.filter(EXPECTED) if visible else posts.exclude(EXPECTED)
+
+
+def drift():
+    """Ids of drifted posts keyed by the flag they should have."""
+    return {
+        visible: set(drifted(visible).values_list('id', flat=True))
+        for visible in (True, False)
+    }
+
+
+def repair():
+    """Fix every drifted flag; returns ``{flag: number of posts}``."""
+    return {
+        visible: drifted(visible).update(is_visible=visible)
+        for visible in (True, False)
+    }
@@ -39,12 +39,16 @@ INSTALLED_APPS = [
     'django_bootstrap5',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'jobs.apps.JobsConfig',
     'debug_toolbar',
 ]
 
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.MetricsMiddleware',
+    'blog.middleware.ServerTimingMiddleware',
+    'blog.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blog.middleware.FragmentCacheStatsMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -60,7 +65,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.timing.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -84,6 +89,68 @@ DATABASES = {
     }
 }
 
+# Scope versions of blog.cache must be shared by all workers, otherwise
+# an invalidation reaches one process only. The file cache is shared on
+# one host; run several hosts on Redis or Memcached. MAX_ENTRIES leaves
+# room for a card fragment per post plus the cached pages: a culled
+# scope version only costs a miss, as its scope starts a new version.
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_backends.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 200000,
+            'CULL_INTERVAL': 10,
+        },
+    }
+}
+
+BLOG_PAGE_CACHE = False
+
+BLOG_PAGE_CACHE_TIMEOUT = 300
+
+BLOG_FEED_CACHE_TIMEOUT = 600
+
+BLOG_FRONT_PAGE_SIZE = 100
+
+BLOG_FRAGMENT_CACHE = True
+
+BLOG_FRAGMENT_CACHE_TIMEOUT = 3600
+
+BLOG_SERVER_TIMING_APPS = ('blog', 'pages')
+
+BLOG_PROFILING_APPS = ('blog',)
+
+BLOG_METRICS_PATH = BASE_DIR / 'metrics.sqlite3'
+
+# Bearer token of the /-/metrics scraper; the endpoint is off while empty.
+BLOG_METRICS_TOKEN = ''
+
+BLOG_METRICS_FLUSH_INTERVAL = 1.0
+
+BLOG_PROFILING_DIR = BASE_DIR / 'profiles'
+
+JOBS_MAX_ATTEMPTS = 5
+
+JOBS_VISIBILITY_TIMEOUT = 300
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -4,11 +4,14 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.metrics import metrics_view
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_failure'
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('-/metrics', metrics_view, name='metrics'),
     path('pages/', include('pages.urls', namespace='pages')),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/registration/', CreateView.as_view(
@@ -0,0 +1,67 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import run_pending, work
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Количество обработчиков.'
+        )
+        parser.add_argument(
+            '--mode', choices=('thread', 'process'), default='thread',
+            help='Запускать обработчики в потоках или в процессах.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить накопившиеся задачи в текущем потоке и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = run_pending()
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+
+        if options['mode'] == 'process':
+            connections.close_all()
+            stop_event = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(
+                    target=work, args=(stop_event, options['poll_interval'])
+                )
+                for _ in range(options['workers'])
+            ]
+        else:
+            stop_event = threading.Event()
+            workers = [
+                threading.Thread(
+                    target=work, args=(stop_event, options['poll_interval'])
+                )
+                for _ in range(options['workers'])
+            ]
+
+        def stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        for worker in workers:
+            worker.start()
+        self.stdout.write(
+            f"Запущено обработчиков: {len(workers)} ({options['mode']})"
+        )
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+TASKS = {}
+
+
+def task(name):
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """Queue ``name`` for a worker.
+
+    The job row is written on the caller's connection, so inside
+    ``transaction.atomic()`` it is committed or rolled back together
+    with the data it refers to.
+    """
+    return schedule(name, timezone.now(), **payload)
+
+
+def schedule(name, run_after, **payload):
+    """Queue ``name`` to run no earlier than ``run_after``."""
+    if name not in TASKS:
+        raise KeyError(f'Unknown task: {name}')
+    return Job.objects.create(
+        task=name,
+        payload=payload,
+        run_after=run_after,
+        max_attempts=getattr(settings, 'JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def enqueue_many(name, payloads, batch_size=None):
+    """Queue one ``name`` job per payload with a single bulk insert."""
+    if name not in TASKS:
+        raise KeyError(f'Unknown task: {name}')
+    max_attempts = getattr(settings, 'JOBS_MAX_ATTEMPTS', 5)
+    return Job.objects.bulk_create(
+        (Job(task=name, payload=payload, max_attempts=max_attempts)
+         for payload in payloads),
+        batch_size=batch_size,
+    )
@@ -0,0 +1,85 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import TASKS
+
+logger = logging.getLogger(__name__)
+
+CLAIM_BATCH = 10
+
+
+def visibility_timeout():
+    return timedelta(
+        seconds=getattr(settings, 'JOBS_VISIBILITY_TIMEOUT', 300)
+    )
+
+
+def ready_jobs(now):
+    return Job.objects.filter(
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim_job():
+    now = timezone.now()
+    candidates = ready_jobs(now).values_list('pk', flat=True)
+    for pk in candidates[:CLAIM_BATCH]:
+        claimed = ready_jobs(now).filter(pk=pk).update(
+            status=Job.RUNNING,
+            locked_until=now + visibility_timeout(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    try:
+        TASKS[job.task](**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            logger.error('Job %s failed for good', job)
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=2 ** job.attempts
+            )
+            logger.warning('Job %s failed, retrying', job)
+        job.locked_until = None
+        job.save(update_fields=['status', 'run_after', 'locked_until',
+                                'last_error'])
+        return False
+    job.delete()
+    return True
+
+
+def run_pending():
+    processed = 0
+    while True:
+        job = claim_job()
+        if job is None:
+            return processed
+        run_job(job)
+        processed += 1
+
+
+def work(stop_event, poll_interval):
+    while not stop_event.is_set():
+        close_old_connections()
+        job = claim_job()
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        run_job(job)
+    connection.close()
@@ -41,6 +41,26 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True, scope='session')
+def temporary_cache(tmp_path_factory):
+    # Keep the file cache of the test run out of the project directory.
+    from django.conf import settings
+
+    caches = {'default': {
+        **settings.CACHES['default'],
+        'LOCATION': tmp_path_factory.mktemp('cache'),
+    }}
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(temporary_cache, django_db_setup):
+    # Migrations write to the cache, so create the test database after
+    # the cache has moved.
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -317,6 +337,21 @@ def _testget_context_item_by_key(context, key: str, err_msg: str) -> KeyVal:
     return KeyVal(key, context_as_dict[key])
 
 
+def assert_query_uses_index(queryset, index_name: str) -> str:
+    """Check the SQLite query plan of `queryset` against `index_name`.
+
+    Fails if the index is not searched or if rows are sorted in a temp
+    B-tree instead of being read in index order."""
+    plan = queryset.explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Query plan does not use `{index_name}`:\n{plan}"
+    )
+    assert "USE TEMP B-TREE" not in plan, (
+        f"Query plan sorts in a temp B-tree:\n{plan}"
+    )
+    return plan
+
+
 def get_page_context_form(user_client: Client, page_url: str) -> KeyVal:
     response = user_client.get(page_url)
     if not str(response.status_code).startswith("2"):
@@ -347,6 +382,16 @@ def get_field_key(field_type: type, field: Field) -> Tuple[str, Optional[str]]:
         return (field_type.__name__, None)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def metrics_store(tmp_path_factory):
+    from django.conf import settings
+
+    settings.BLOG_METRICS_PATH = (
+        tmp_path_factory.mktemp("metrics") / "metrics.sqlite3"
+    )
+    return settings.BLOG_METRICS_PATH
+
+
 @pytest.fixture(scope="session", autouse=True)
 def cleanup(request):
     start_time = time.time()
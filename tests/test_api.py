@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+POSTS_PER_PAGE = 10
+
+
+def test_post_list_pages_through_public_posts(
+        client, many_posts_with_published_locations, future_posts):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    seen, url = [], '/api/v1/posts/'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        data = response.json()
+        assert len(data['results']) <= POSTS_PER_PAGE
+        seen.extend(item['id'] for item in data['results'])
+        url = data['next']
+    assert seen == [post.id for post in expected], (
+        'Убедитесь, что API отдаёт только опубликованные посты '
+        'в порядке ленты.'
+    )
+
+
+def test_post_detail_fields(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get(f'/api/v1/posts/{post.id}/')
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {
+        'id', 'title', 'text', 'pub_date', 'author',
+        'category', 'location', 'comment_count',
+    }
+    assert data['author'] == post.author.username
+    assert data['category'] == post.category.slug
+
+
+def test_unpublished_post_is_404(client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    for url in (f'/api/v1/posts/{post.id}/',
+                f'/api/v1/posts/{post.id}/comments/'):
+        response = client.get(url)
+        assert response.status_code == 404
+        assert 'detail' in response.json()
+
+
+def test_comment_list(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Commentary', post=post)
+    data = client.get(f'/api/v1/posts/{post.id}/comments/').json()
+    assert [item['id'] for item in data['results']] == [
+        comment.id for comment in comments
+    ]
+    assert data['next'] is None
+
+
+def test_category_list(client, published_category, mixer):
+    mixer.blend('blog.Category', is_published=False)
+    data = client.get('/api/v1/categories/').json()
+    assert [item['slug'] for item in data['results']] == [
+        published_category.slug
+    ]
+
+
+def test_api_is_read_only(user_client, post_with_published_location):
+    assert user_client.post('/api/v1/posts/').status_code == 405
+
+
+def test_export_streams_ndjson(
+        client, mixer, many_posts_with_published_locations,
+        posts_with_unpublished_category):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(2).blend('blog.Commentary', post=post)
+    response = client.get('/api/v1/posts/export/')
+    assert response.streaming, (
+        'Убедитесь, что выгрузка постов отдаётся потоком.'
+    )
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    ids = {json.loads(line)['id'] for line in lines}
+    assert ids == {item.id for item in many_posts_with_published_locations}
+
+    response = client.get('/api/v1/comments/export/')
+    assert response.streaming
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)['post'] for line in lines] == [post.id] * 2
@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.measure import compare, measure, percentile
+from benchmarks.scenarios import build_scenarios
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.9) == 7
+
+
+def test_compare_flags_slower_views_and_extra_queries():
+    baseline = {
+        'homepage': {'p50_ms': 10.0, 'queries': 5},
+        'detail': {'p50_ms': 10.0, 'queries': 5},
+        'profile': {'p50_ms': 10.0, 'queries': 5},
+    }
+    current = {
+        'homepage': {'p50_ms': 11.9, 'queries': 5},
+        'detail': {'p50_ms': 12.5, 'queries': 6},
+    }
+    regressions = compare(baseline, current, threshold=0.2)
+    assert [view for view, _ in regressions] == [
+        'detail', 'detail', 'profile'
+    ]
+
+
+def test_scenarios_measure_every_view(client, post_with_published_location):
+    results = {
+        scenario.name: measure(client, scenario, repeat=2, warmup=0)
+        for scenario in build_scenarios()
+    }
+    assert set(results) == {
+        'homepage', 'category', 'profile', 'detail',
+        'comment_create', 'comment_edit',
+    }
+    for result in results.values():
+        assert result['queries'] > 0
+        assert result['p50_ms'] <= result['p99_ms']
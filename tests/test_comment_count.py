@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import FrontPageEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, another_user, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/comment'
+    for text in ('Первый', 'Второй'):
+        user_client.post(url, {'text': text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что счётчик комментариев увеличивается при создании '
+        'комментария.'
+    )
+
+    comment = post.commentaries.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что счётчик комментариев уменьшается при удалении '
+        'комментария.'
+    )
+
+
+def test_comment_count_on_user_cascade(
+        mixer, another_user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Commentary', post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_recount_comments_repairs_drift(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Commentary', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+    FrontPageEntry.objects.filter(id=post.pk).update(comment_count=42)
+    call_command('recount_comments')
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    assert FrontPageEntry.objects.get(id=post.pk).comment_count == 2, (
+        'Убедитесь, что recount_comments исправляет и окно главной.'
+    )
@@ -0,0 +1,64 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_PER_PAGE = 20
+
+
+def _comment_ids(content):
+    return [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def _more_link(content):
+    match = re.search(r'data-comments-more\s+href="([^"]+)"', content)
+    return match and match.group(1).replace('&amp;', '&')
+
+
+def test_comments_are_loaded_page_by_page(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE * 2 + 5).blend(
+        'blog.Commentary', post=post
+    )
+    expected = [comment.id for comment in comments]
+
+    content = client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    seen = _comment_ids(content)
+    assert len(seen) == COMMENTS_PER_PAGE, (
+        'Убедитесь, что на странице поста выводится только первая страница '
+        'комментариев.'
+    )
+    link = _more_link(content)
+    while link:
+        response = client.get(link)
+        assert response.status_code == 200
+        content = response.content.decode('utf-8')
+        seen.extend(_comment_ids(content))
+        link = _more_link(content)
+    assert seen == expected
+
+
+def test_detail_cost_does_not_depend_on_thread_size(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    mixer.cycle(3).blend('blog.Commentary', post=post)
+    with CaptureQueriesContext(connection) as small_thread:
+        client.get(url)
+    mixer.cycle(COMMENTS_PER_PAGE * 3).blend('blog.Commentary', post=post)
+    with CaptureQueriesContext(connection) as big_thread:
+        client.get(url)
+    assert len(big_thread) == len(small_thread)
+
+
+def test_comment_fragment_respects_visibility(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/', {'after': 'x'})
+    assert response.status_code == 404
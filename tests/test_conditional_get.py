@@ -0,0 +1,77 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code
+
+
+@pytest.mark.parametrize('page', ('homepage', 'category', 'detail'))
+def test_unchanged_page_is_not_modified(
+        client, post_with_published_location, page):
+    post = post_with_published_location
+    url = {
+        'homepage': '/',
+        'category': f'/category/{post.category.slug}/',
+        'detail': f'/posts/{post.id}/',
+    }[page]
+    response = client.get(url)
+    assert response.has_header('ETag')
+    assert response.has_header('Last-Modified') == (page == 'detail'), (
+        'Убедитесь, что у лент нет Last-Modified, а у поста он есть.'
+    )
+    assert _revalidate(client, url, response) == 304, (
+        'Убедитесь, что неизменившаяся страница отдаётся с кодом 304.'
+    )
+    if page == 'detail':
+        modified_since = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert modified_since.status_code == 304
+
+
+def test_deleted_post_changes_feed_validators(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    newer = mixer.blend('blog.Post', author=post.author,
+                        category=post.category, is_published=True,
+                        pub_date=post.pub_date)
+    response = client.get('/')
+    newer.delete()
+    assert _revalidate(client, '/', response) == 200
+
+
+def test_comment_changes_validators(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    urls = ('/', f'/posts/{post.id}/', f'/category/{post.category.slug}/')
+    responses = {url: client.get(url) for url in urls}
+    comment = mixer.blend('blog.Commentary', post=post)
+    for url in urls:
+        assert _revalidate(client, url, responses[url]) == 200
+
+    detail_url = f'/posts/{post.id}/'
+    response = client.get(detail_url)
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert _revalidate(client, detail_url, response) == 200
+
+
+def test_validators_vary_by_user(
+        client, user_client, post_with_published_location):
+    anonymous = client.get('/')
+    assert _revalidate(user_client, '/', anonymous) == 200
+
+
+def test_author_sees_own_unpublished_post(
+        user_client, client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert _revalidate(user_client, url, response) == 304
+    assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code \
+        == 404
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_detail_page_takes_two_queries(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Commentary', post=post)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+    assert len(queries) == 2, (
+        'Убедитесь, что страница поста загружает пост вместе с автором, '
+        'категорией и местоположением одним запросом, а комментарии — '
+        'вторым.'
+    )
+    post_sql, comments_sql = queries.captured_queries
+    assert 'blog_category' in post_sql['sql']
+    assert 'blog_location' in post_sql['sql']
+    assert '"is_visible"' in post_sql['sql'].split('WHERE')[1]
+    assert 'blog_commentary' in comments_sql['sql']
+
+
+def test_hidden_post_is_rejected_by_one_query(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404
+    assert len(queries) == 1
+
+
+def test_author_sees_own_hidden_post_without_comments(
+        user_client, mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, is_published=False,
+                       category=published_category)
+    mixer.blend('blog.Commentary', post=post)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+    assert not any('blog_commentary' in query['sql']
+                   for query in queries.captured_queries)
+    assert 'Пост снят с публикации админом' in response.content.decode()
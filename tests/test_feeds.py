@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def feed_urls(post):
+    return (
+        '/feeds/rss/',
+        '/feeds/atom/',
+        f'/feeds/category/{post.category.slug}/rss/',
+        f'/feeds/category/{post.category.slug}/atom/',
+        f'/feeds/profile/{post.author.username}/rss/',
+        f'/feeds/profile/{post.author.username}/atom/',
+    )
+
+
+def test_feeds_list_published_posts(client, post_with_published_location):
+    post = post_with_published_location
+    for url in feed_urls(post):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Убедитесь, что лента `{url}` доступна.'
+        )
+        assert post.title in response.content.decode(), (
+            f'Убедитесь, что лента `{url}` содержит опубликованный пост.'
+        )
+
+
+def test_feed_of_unknown_category_is_404(client):
+    assert client.get('/feeds/category/unknown/rss/').status_code == 404
+
+
+def test_feed_is_served_from_cache(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as first:
+        response = client.get('/feeds/rss/')
+    assert response['X-Page-Cache'] == 'MISS'
+    assert not any(
+        'blog_commentary' in query['sql'] for query in first.captured_queries
+    ), 'Убедитесь, что лента не обращается к таблице комментариев.'
+
+    with CaptureQueriesContext(connection) as second:
+        cached = client.get('/feeds/rss/')
+    assert cached['X-Page-Cache'] == 'HIT'
+    assert cached.content == response.content
+    assert len(second.captured_queries) == 0, (
+        'Убедитесь, что закешированная лента отдаётся без запросов к БД.'
+    )
+
+
+def test_unchanged_feed_is_not_modified(client, post_with_published_location):
+    response = client.get('/feeds/atom/')
+    with CaptureQueriesContext(connection) as queries:
+        revalidated = client.get(
+            '/feeds/atom/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert revalidated.status_code == 304
+    assert len(queries.captured_queries) == 0
+
+
+def test_post_change_invalidates_feeds(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    responses = {url: client.get(url) for url in feed_urls(post)}
+
+    mixer.blend('blog.Commentary', post=post)
+    for url, response in responses.items():
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 304, (
+            'Убедитесь, что комментарии не сбрасывают кеш лент.'
+        )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    for url, response in responses.items():
+        updated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert updated.status_code == 200, (
+            f'Убедитесь, что изменение поста сбрасывает кеш ленты `{url}`.'
+        )
+        assert 'Новый заголовок' in updated.content.decode()
@@ -0,0 +1,43 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _fragment_stats(client, url='/'):
+    return client.get(url)['X-Fragment-Cache']
+
+
+def test_warm_feed_skips_card_rendering(
+        user_client, many_posts_with_published_locations):
+    assert _fragment_stats(user_client) == 'hits=0, misses=10'
+    assert _fragment_stats(user_client) == 'hits=10, misses=0', (
+        'Убедитесь, что карточки публикаций на прогретой ленте берутся '
+        'из кеша фрагментов.'
+    )
+
+
+def test_card_version_follows_related_changes(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+
+    post.category.title = 'Новое название категории'
+    post.category.save()
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Новое название категории' in content
+
+    mixer.blend('blog.Commentary', post=post)
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Комментарии (1)' in content
+
+    post.author.username = 'renamed_author'
+    post.author.save()
+    assert '@renamed_author' in user_client.get('/').content.decode('utf-8')
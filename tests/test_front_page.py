@@ -0,0 +1,146 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import frontpage, scheduling
+from blog.models import FrontPageEntry, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def window(settings):
+    settings.BLOG_FRONT_PAGE_SIZE = 12
+    return settings.BLOG_FRONT_PAGE_SIZE
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make_post(**kwargs):
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        return mixer.blend('blog.Post', author=user,
+                           category=published_category, is_published=True,
+                           **kwargs)
+    return make_post
+
+
+def window_ids():
+    return list(FrontPageEntry.objects.values_list('id', flat=True))
+
+
+def live_ids(limit):
+    return list(Post.objects.visible_to().values_list('id', flat=True)[
+        :limit
+    ])
+
+
+def page_ids(client, url):
+    content = client.get(url).content.decode()
+    return [int(pk) for pk in re.findall(r'/posts/(\d+)/"', content)]
+
+
+def test_window_follows_post_changes(window, make_post, mixer):
+    posts = [make_post(pub_date=timezone.now() - timedelta(hours=hours))
+             for hours in range(1, window + 4)]
+    assert window_ids() == live_ids(window)
+
+    newest = posts[0]
+    newest.title = 'Новый заголовок'
+    newest.save()
+    assert FrontPageEntry.objects.get(id=newest.pk).title == newest.title
+
+    newest.is_published = False
+    newest.save()
+    assert window_ids() == live_ids(window), (
+        'Убедитесь, что снятый с публикации пост уходит из окна, а окно '
+        'дополняется следующим постом.'
+    )
+    posts[1].delete()
+    assert window_ids() == live_ids(window)
+
+    mixer.blend('blog.Commentary', post=posts[2])
+    assert FrontPageEntry.objects.get(id=posts[2].pk).comment_count == 1
+
+
+def test_taxonomy_changes_rebuild_window(make_post, published_category):
+    post = make_post()
+    published_category.title = 'Переименованная'
+    published_category.save()
+    assert FrontPageEntry.objects.get(
+        id=post.pk
+    ).category_title == 'Переименованная'
+    published_category.is_published = False
+    published_category.save()
+    assert not FrontPageEntry.objects.exists()
+
+
+def test_taxonomy_saves_patch_window_in_place(
+        make_post, published_category, published_location, user):
+    post = make_post(location=published_location)
+    with CaptureQueriesContext(connection) as queries:
+        published_category.save()
+        user.save()
+    assert not any(
+        query['sql'].startswith('DELETE FROM "blog_frontpageentry"')
+        for query in queries.captured_queries
+    ), 'Убедитесь, что сохранение категории не перестраивает окно.'
+
+    published_location.name = 'Новое место'
+    published_location.save()
+    user.username = 'renamed'
+    user.save()
+    entry = FrontPageEntry.objects.get(id=post.pk)
+    assert (entry.location_name, entry.author_username) == (
+        'Новое место', 'renamed'
+    )
+    published_location.is_published = False
+    published_location.save()
+    assert FrontPageEntry.objects.get(id=post.pk).location_name == ''
+
+
+def test_first_pages_are_read_without_joins(client, window, make_post):
+    for hours in range(1, window + 9):
+        make_post(pub_date=timezone.now() - timedelta(hours=hours))
+    client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        first = page_ids(client, '/')
+    assert first == live_ids(10)
+    assert not any('JOIN' in query['sql'].upper()
+                   for query in queries.captured_queries), (
+        'Убедитесь, что первые страницы главной читаются из окна без JOIN.'
+    )
+    cursor = client.get('/').context['page_obj'].next_cursor
+    second = page_ids(client, f'/?after={cursor}')
+    assert second == live_ids(20)[10:], (
+        'Убедитесь, что за пределами окна используется живой запрос.'
+    )
+
+
+def test_scheduled_post_enters_window_when_promoted(
+        make_post, monkeypatch, django_capture_on_commit_callbacks):
+    make_post()
+    assert frontpage.valid_until() == frontpage.FOREVER
+    with django_capture_on_commit_callbacks() as callbacks:
+        post = make_post(pub_date=timezone.now() + timedelta(hours=1))
+    assert frontpage.valid_until() == frontpage.FOREVER, (
+        'Убедитесь, что граница окна сбрасывается только после коммита.'
+    )
+    for callback in callbacks:
+        callback()
+    assert post.pk not in window_ids()
+    assert frontpage.valid_until() == post.pub_date
+
+    later = post.pub_date + timedelta(minutes=1)
+    monkeypatch.setattr(frontpage.timezone, 'now', lambda: later)
+    assert frontpage.get_page(None, 10, None) is None, (
+        'Убедитесь, что окно не используется, пока наступивший отложенный '
+        'пост не выпущен.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        scheduling.publish_due(later)
+    assert window_ids()[0] == post.pk
+    assert frontpage.valid_until() == frontpage.FOREVER
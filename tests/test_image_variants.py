@@ -0,0 +1,112 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _jpeg(size, orientation=None):
+    img = Image.new('RGB', size, color=(73, 109, 137))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    img_io = BytesIO()
+    img.save(img_io, format='JPEG', exif=exif)
+    return img_io.getvalue()
+
+
+def test_upload_builds_variants(
+        user_client, published_category, published_location):
+    response = user_client.post('/posts/create/', {
+        'title': 'Пост с фото',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.id,
+        'location': published_location.id,
+        'image': SimpleUploadedFile(
+            'wide.jpg', _jpeg((2000, 1000), orientation=6), 'image/jpeg'
+        ),
+    })
+    assert response.status_code == 302
+    from blog.models import Post
+
+    post = Post.objects.get(title='Пост с фото')
+    assert post.image_variants == {}, (
+        'Убедитесь, что копии фото строятся в фоновой задаче, '
+        'а не во время запроса.'
+    )
+    call_command('run_workers', once=True)
+    post.refresh_from_db()
+    assert set(post.image_variants) == {'placeholder', 'card', 'detail'}
+    card = post.card_image
+    assert (card.width, card.height) == (640, 1280), (
+        'Убедитесь, что копии фото учитывают ориентацию из EXIF.'
+    )
+
+    content = user_client.get('/').content.decode('utf-8')
+    img = BeautifulSoup(content, features='html.parser').find(
+        'img', srcset=True
+    )
+    assert img['src'] == card.url
+    assert img['loading'] == 'lazy'
+    assert (img['width'], img['height']) == ('640', '1280')
+    assert f'{post.detail_image.url} 1000w' in img['srcset']
+
+
+def test_backfill_command(post_with_published_location):
+    post = post_with_published_location
+    assert post.image_variants == {}
+    call_command('build_image_variants', workers=1)
+    post.refresh_from_db()
+    assert post.card_image.width == 100
+
+
+def test_rebuild_deletes_old_variants_after_commit(
+        post_with_published_location, django_capture_on_commit_callbacks):
+    from django.core.files.storage import default_storage
+
+    post = post_with_published_location
+    post.refresh_image_variants()
+    old_names = [variant['name'] for variant in post.image_variants.values()]
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.refresh_image_variants()
+        assert all(map(default_storage.exists, old_names)), (
+            'Убедитесь, что старые копии фото удаляются только после '
+            'сохранения новых.'
+        )
+    for callback in callbacks:
+        callback()
+    assert not any(map(default_storage.exists, old_names))
+    assert all(default_storage.exists(variant['name'])
+               for variant in post.image_variants.values())
+
+
+def test_new_image_drops_old_variants(
+        user_client, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    from django.core.files.storage import default_storage
+
+    post = post_with_published_location
+    post.refresh_image_variants()
+    old_names = [variant['name'] for variant in post.image_variants.values()]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(f'/posts/{post.id}/edit/', {
+            'title': post.title,
+            'text': post.text,
+            'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+            'category': post.category_id,
+            'location': post.location_id,
+            'image': SimpleUploadedFile(
+                'new.jpg', _jpeg((300, 200)), 'image/jpeg'
+            ),
+        })
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.image_variants == {}, (
+        'Убедитесь, что копии старого фото не показываются для нового.'
+    )
+    assert not any(map(default_storage.exists, old_names))
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from conftest import assert_query_uses_index
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Query plans are checked for SQLite only.'
+    ),
+]
+
+
+def _first_page(queryset):
+    return queryset.order_by('-pub_date', '-id')[:11]
+
+
+def test_homepage_feed_uses_index():
+    from blog.models import Post
+
+    queryset = Post.objects.visible_to()
+    assert_query_uses_index(_first_page(queryset), 'post_feed_idx')
+
+    now = timezone.now()
+    after_cursor = queryset.filter(
+        Q(pub_date__lt=now) | Q(pub_date=now, id__lt=100)
+    )
+    assert_query_uses_index(_first_page(after_cursor), 'post_feed_idx')
+
+
+def test_category_feed_uses_index():
+    from blog.models import Post
+
+    queryset = Post.objects.visible_to().filter(category_id=1)
+    assert_query_uses_index(_first_page(queryset), 'post_category_feed_idx')
+
+
+@pytest.mark.parametrize('own_profile', (False, True))
+def test_profile_feed_uses_index(own_profile):
+    from django.contrib.auth.models import AnonymousUser, User
+
+    from blog.models import Post
+
+    viewer = User(pk=1) if own_profile else AnonymousUser()
+    queryset = Post.objects.visible_to(viewer).filter(author_id=1)
+    assert_query_uses_index(_first_page(queryset), 'post_author_feed_idx')
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import enqueue, task
+from jobs.worker import claim_job, run_job, run_pending
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@task('tests.record')
+def record(value, fail=False):
+    CALLS.append(value)
+    if fail:
+        raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+def test_job_runs_and_leaves_queue():
+    enqueue('tests.record', value=1)
+    assert run_pending() == 1
+    assert CALLS == [1]
+    assert not Job.objects.exists()
+
+
+def test_enqueue_rolls_back_with_transaction():
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            enqueue('tests.record', value=1)
+            raise RuntimeError
+    assert not Job.objects.exists()
+
+
+def test_failed_job_is_retried_with_backoff():
+    job = enqueue('tests.record', value=1, fail=True)
+    job.max_attempts = 2
+    job.save()
+
+    run_job(claim_job())
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.PENDING, 1)
+    assert job.run_after > timezone.now()
+    assert claim_job() is None
+
+    Job.objects.update(run_after=timezone.now())
+    run_job(claim_job())
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.FAILED, 2)
+    assert 'boom' in job.last_error
+
+
+def test_stuck_job_is_reclaimed_after_visibility_timeout():
+    job = enqueue('tests.record', value=1)
+    assert claim_job() == job
+    assert claim_job() is None
+
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    reclaimed = claim_job()
+    assert reclaimed == job
+    assert reclaimed.attempts == 2
@@ -0,0 +1,106 @@
+import re
+
+import pytest
+
+from blog.metrics import MetricsStore, store
+from jobs.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+TOKEN = 'scraper-secret'
+
+
+@pytest.fixture
+def metrics_path(settings, tmp_path):
+    settings.BLOG_METRICS_PATH = tmp_path / 'metrics.sqlite3'
+    settings.BLOG_METRICS_TOKEN = TOKEN
+    return settings.BLOG_METRICS_PATH
+
+
+def scrape(client):
+    response = client.get('/-/metrics',
+                          HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def value(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.M)
+    return match and float(match.group(1))
+
+
+def test_requests_are_counted_per_url_name(
+        client, metrics_path, post_with_published_location):
+    for _ in range(3):
+        client.get('/')
+    client.get(f'/posts/{post_with_published_location.id}/')
+    client.get('/posts/999999/')
+    text = scrape(client)
+    assert value(text, 'blog_http_requests_total{view="blog:homepage",'
+                       'method="GET",status="200"}') == 3
+    assert value(text, 'blog_http_requests_total{view="blog:post_detail",'
+                       'method="GET",status="404"}') == 1
+    assert '# TYPE blog_http_request_duration_seconds histogram' in text
+    assert value(text, 'blog_http_request_duration_seconds_count'
+                       '{view="blog:homepage"}') == 3
+    assert value(text, 'blog_http_request_duration_seconds_bucket'
+                       '{view="blog:homepage",le="+Inf"}') == 3
+    assert value(text, 'blog_db_queries_total{view="blog:homepage"}') > 0
+    assert value(
+        text, 'blog_cache_requests_total{cache="fragment",result="miss"}'
+    ) >= 1
+
+
+def test_job_queue_depth(client, metrics_path):
+    Job.objects.create(task='blog.build_image_variants', payload={})
+    text = scrape(client)
+    assert value(text, 'blog_jobs{status="pending"}') == 1
+    assert value(text, 'blog_jobs_ready') == 1
+
+
+def test_metrics_are_internal(client, metrics_path, settings):
+    assert client.get('/-/metrics').status_code == 404
+    response = client.get('/-/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+    assert response.status_code == 404
+    settings.BLOG_METRICS_TOKEN = ''
+    response = client.get('/-/metrics', HTTP_AUTHORIZATION='Bearer ')
+    assert response.status_code == 404
+
+
+def test_histogram_lists_every_bucket_in_order(client, metrics_path):
+    store().observe('blog_http_request_duration_seconds', 0.3,
+                    view='blog:homepage')
+    text = scrape(client)
+    bounds = re.findall(
+        r'^blog_http_request_duration_seconds_bucket'
+        r'\{view="blog:homepage",le="([^"]+)"\} (\S+)$', text, re.M
+    )
+    assert bounds == [
+        ('0.005', '0'), ('0.01', '0'), ('0.025', '0'), ('0.05', '0'),
+        ('0.1', '0'), ('0.25', '0'), ('0.5', '1'), ('1.0', '1'),
+        ('2.5', '1'), ('5.0', '1'), ('10.0', '1'), ('+Inf', '1'),
+    ], 'Убедитесь, что гистограмма выводит все корзины по возрастанию.'
+
+
+def test_failed_flush_keeps_deltas(metrics_path, tmp_path):
+    metrics_store = MetricsStore(tmp_path / 'missing' / 'metrics.sqlite3',
+                                 flush_interval=0)
+    metrics_store.inc('blog_http_requests_total', view='blog:homepage')
+    with pytest.raises(Exception):
+        metrics_store.flush()
+    assert metrics_store.pending == {
+        ('blog_http_requests_total', 'view="blog:homepage"'): 1
+    }
+
+
+def test_processes_add_up_in_shared_store(metrics_path):
+    first = MetricsStore(metrics_path, flush_interval=0)
+    second = MetricsStore(metrics_path, flush_interval=0)
+    first.inc('blog_http_requests_total', view='blog:homepage')
+    second.inc('blog_http_requests_total', 2, view='blog:homepage')
+    first.flush()
+    second.flush()
+    assert store().samples() == [
+        ('blog_http_requests_total', 'view="blog:homepage"', 3.0)
+    ]
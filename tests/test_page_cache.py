@@ -0,0 +1,109 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    cache.clear()
+    with override_settings(BLOG_PAGE_CACHE=True):
+        yield
+    cache.clear()
+
+
+def _cache_status(client, url):
+    return client.get(url)['X-Page-Cache']
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location):
+    post = post_with_published_location
+    for url in ('/', f'/posts/{post.id}/',
+                f'/category/{post.category.slug}/'):
+        assert _cache_status(client, url) == 'MISS'
+        assert _cache_status(client, url) == 'HIT', (
+            f'Убедитесь, что страница {url} кешируется для анонимов.'
+        )
+
+
+def test_logged_in_users_bypass_cache(
+        user_client, post_with_published_location):
+    user_client.get('/')
+    assert 'X-Page-Cache' not in user_client.get('/')
+
+
+def test_comment_evicts_only_affected_pages(
+        client, mixer, another_category, post_with_published_location):
+    post = post_with_published_location
+    other_post = mixer.blend(
+        'blog.Post', category=another_category, is_published=True
+    )
+    urls = ('/', f'/posts/{post.id}/', f'/category/{post.category.slug}/',
+            f'/posts/{other_post.id}/', f'/category/{another_category.slug}/')
+    for url in urls:
+        client.get(url)
+
+    mixer.blend('blog.Commentary', post=post)
+
+    statuses = [_cache_status(client, url) for url in urls]
+    assert statuses == ['MISS', 'MISS', 'MISS', 'HIT', 'HIT']
+
+
+def test_hit_ratio_is_reported(client, post_with_published_location):
+    from blog.cache import page_cache_stats
+
+    for _ in range(4):
+        client.get('/')
+    stats = page_cache_stats()
+    assert (stats['hits'], stats['misses']) == (3, 1)
+    assert stats['ratio'] == 0.75
+
+
+def test_page_cache_requires_shared_backend(client, settings):
+    from blog.cache import page_cache_enabled
+    from blog.checks import check_shared_cache
+
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert not page_cache_enabled(), (
+        'Убедитесь, что кеш страниц не включается без общего кеша.'
+    )
+    assert [error.id for error in check_shared_cache(None)] == ['blog.E001']
+    assert 'X-Page-Cache' not in client.get('/')
+
+
+def test_invalidate_writes_fresh_versions(monkeypatch):
+    from blog import cache as blog_cache
+
+    monkeypatch.setattr(cache, 'incr', None)
+    before = blog_cache.scope_versions([blog_cache.FEED_SCOPE])
+    blog_cache.invalidate(blog_cache.FEED_SCOPE, blog_cache.POST_SCOPE)
+    after = blog_cache.scope_versions([blog_cache.FEED_SCOPE])
+    assert after != before, (
+        'Убедитесь, что invalidate() записывает новую версию без incr().'
+    )
+
+
+@pytest.mark.parametrize('page', ('homepage', 'category', 'detail'))
+def test_cache_hit_skips_validators(
+        client, post_with_published_location, page):
+    post = post_with_published_location
+    url = {
+        'homepage': '/',
+        'category': f'/category/{post.category.slug}/',
+        'detail': f'/posts/{post.id}/',
+    }[page]
+    etag = client.get(url)['ETag']
+    with CaptureQueriesContext(connection) as queries:
+        hit = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert (hit['X-Page-Cache'], hit['ETag']) == ('HIT', etag)
+    assert not_modified.status_code == 304
+    assert len(queries) == 0, (
+        'Убедитесь, что попадание в кеш страниц не выполняет запросов к БД.'
+    )
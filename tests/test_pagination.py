@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts_same_pub_date(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+
+
+def _walk_forward(client, url):
+    seen = []
+    response = client.get(url)
+    while True:
+        page_obj = response.context['page_obj']
+        seen.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            return seen, page_obj
+        response = client.get(url, {'after': page_obj.next_cursor})
+
+
+def test_cursor_walks_whole_feed(user_client, many_posts_same_pub_date):
+    seen, last_page = _walk_forward(user_client, '/')
+    expected = sorted((post.id for post in many_posts_same_pub_date),
+                      reverse=True)
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация на главной странице обходит все '
+        'публикации ровно один раз, даже при совпадающей дате публикации.'
+    )
+    assert last_page.number == 3
+
+    response = user_client.get('/', {'before': last_page.previous_cursor})
+    page_obj = response.context['page_obj']
+    assert page_obj.number == 2
+    assert [post.id for post in page_obj] == expected[N_PER_PAGE:
+                                                      N_PER_PAGE * 2]
+
+
+def test_cursor_page_does_not_count(user_client, many_posts_same_pub_date):
+    page_obj = user_client.get('/').context['page_obj']
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get('/', {'after': page_obj.next_cursor})
+    sql = ' '.join(query['sql'].upper() for query in queries)
+    assert 'COUNT(*)' not in sql
+    assert 'OFFSET' not in sql
+
+
+def test_broken_cursor_falls_back_to_first_page(
+        user_client, many_posts_same_pub_date):
+    response = user_client.get('/', {'after': '!!not-a-cursor!!'})
+    assert response.status_code == 200
+    assert response.context['page_obj'].number == 1
+
+
+@pytest.fixture
+def archive(mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 12).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            lambda n: timezone.now() - timedelta(hours=n + 1)
+        ),
+    )
+
+
+def _follow(client, page_obj, number):
+    link = dict(page_obj.page_links)[number]
+    return client.get(f'/?{link}')
+
+
+def test_page_window_is_elided(client, archive):
+    response = client.get('/')
+    for number in (3, 5, 6):
+        response = _follow(client, response.context['page_obj'], number)
+    page_obj = response.context['page_obj']
+    assert page_obj.number == 6
+    assert [post.id for post in page_obj] == [
+        post.id for post in archive[N_PER_PAGE * 5:N_PER_PAGE * 6]
+    ]
+    assert page_obj.page_window == [1, '…', 4, 5, 6, 7, 8, '…', 12], (
+        'Убедитесь, что пагинатор выводит окно страниц вокруг текущей.'
+    )
+    content = response.content.decode('utf-8')
+    assert content.count('class="page-item') == 11
+    assert 'page=' not in content
+
+    following = client.get('/', {'after': page_obj.next_cursor})
+    assert following.context['page_obj'].number == 7
+
+
+def test_page_links_seek_by_cursor(client, archive):
+    page_obj = client.get('/').context['page_obj']
+    with CaptureQueriesContext(connection) as queries:
+        page_obj = _follow(client, page_obj, 12).context['page_obj']
+        links = dict(page_obj.page_links)
+    assert not any('OFFSET' in query['sql'].upper()
+                   for query in queries), (
+        'Убедитесь, что ссылки на страницы строятся по курсорам, без OFFSET.'
+    )
+    assert page_obj.number == 12
+    assert [post.id for post in page_obj] == [
+        post.id for post in archive[N_PER_PAGE * 11:]
+    ]
+    for number in (10, 11):
+        page_obj = client.get(f'/?{links[number]}').context['page_obj']
+        assert page_obj.number == number
+        assert [post.id for post in page_obj] == [
+            post.id
+            for post in archive[N_PER_PAGE * (number - 1):N_PER_PAGE * number]
+        ]
+
+
+def test_total_is_cached_until_publish(client, mixer, archive):
+    page_obj = client.get('/').context['page_obj']
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/', {'after': page_obj.next_cursor})
+    assert not any('COUNT(' in query['sql'].upper()
+                   for query in queries), (
+        'Убедитесь, что общее число постов берётся из кеша.'
+    )
+    mixer.blend('blog.Post', author=archive[0].author,
+                category=archive[0].category, is_published=True,
+                pub_date=timezone.now() - timedelta(days=30))
+    page_obj = client.get('/').context['page_obj']
+    assert page_obj.paginator.count == len(archive) + 1
+    assert page_obj.paginator.num_pages == 13
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import counters
+from blog.models import PostCounter
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stored(scope, key):
+    return PostCounter.objects.filter(
+        scope=scope, key=key
+    ).values_list('published', flat=True).first() or 0
+
+
+def assert_counts(category, author, by_category, by_author):
+    assert stored(PostCounter.CATEGORY, category.pk) == by_category
+    assert stored(PostCounter.AUTHOR, author.pk) == by_author
+    assert counters.drift() == {}, (
+        'Убедитесь, что счётчики совпадают с полным пересчётом.'
+    )
+
+
+def test_post_lifecycle_updates_counters(
+        mixer, user, published_category, another_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True,
+                       pub_date=timezone.now() - timedelta(days=1))
+    assert_counts(published_category, user, 1, 1)
+
+    post.is_published = False
+    post.save()
+    assert_counts(published_category, user, 0, 0)
+
+    post.is_published = True
+    post.save()
+    post.category = another_category
+    post.save()
+    assert_counts(published_category, user, 0, 1)
+    assert stored(PostCounter.CATEGORY, another_category.pk) == 1
+
+    post.delete()
+    assert_counts(another_category, user, 0, 0)
+
+
+def test_category_unpublish_and_delete(
+        mixer, user, another_user, published_category):
+    mixer.cycle(2).blend('blog.Post', author=user,
+                         category=published_category, is_published=True,
+                         pub_date=timezone.now() - timedelta(days=1))
+    mixer.blend('blog.Post', author=another_user,
+                category=published_category, is_published=True,
+                pub_date=timezone.now() - timedelta(days=1))
+    assert_counts(published_category, user, 3, 2)
+
+    published_category.is_published = False
+    published_category.save()
+    assert_counts(published_category, user, 0, 0)
+    assert stored(PostCounter.AUTHOR, another_user.pk) == 0
+
+    published_category.is_published = True
+    published_category.save()
+    assert_counts(published_category, user, 3, 2)
+
+    published_category.delete()
+    assert stored(PostCounter.AUTHOR, user.pk) == 0
+    assert counters.drift() == {}
+
+
+def test_scheduled_post_is_counted_when_due(
+        mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True, pub_date=pub_date)
+    assert_counts(published_category, user, 0, 0)
+
+    counters.advance(now=pub_date + timedelta(seconds=1))
+    assert stored(PostCounter.CATEGORY, published_category.pk) == 1
+    assert stored(PostCounter.AUTHOR, user.pk) == 1
+    counters.advance(now=pub_date + timedelta(seconds=2))
+    assert stored(PostCounter.AUTHOR, user.pk) == 1, (
+        'Убедитесь, что отложенный пост учитывается ровно один раз.'
+    )
+
+
+def test_concurrent_advance_counts_once(
+        mixer, user, published_category, monkeypatch):
+    pub_date = timezone.now() + timedelta(hours=1)
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True, pub_date=pub_date)
+    stale = counters.checkpoint()
+    counters.advance(now=pub_date + timedelta(seconds=1))
+    monkeypatch.setattr(counters, 'checkpoint', lambda: stale)
+    counters.advance(now=pub_date + timedelta(seconds=2))
+    assert stored(PostCounter.AUTHOR, user.pk) == 1, (
+        'Убедитесь, что интервал засчитывает только один из '
+        'параллельных вызовов advance().'
+    )
+
+
+def test_category_page_reads_counter(
+        client, many_posts_with_published_locations, published_category):
+    client.get(f'/category/{published_category.slug}/')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/category/{published_category.slug}/')
+    assert not any('COUNT(' in query['sql'].upper()
+                   for query in queries.captured_queries)
+    total = len(many_posts_with_published_locations)
+    assert f'Публикаций: {total}' in response.content.decode()
+
+
+def test_check_command_reports_and_rebuild_repairs(
+        mixer, user, published_category):
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True,
+                pub_date=timezone.now() - timedelta(days=1))
+    PostCounter.objects.filter(scope=PostCounter.AUTHOR).update(published=7)
+    with pytest.raises(CommandError):
+        call_command('update_post_counters', '--check', stdout=StringIO())
+    call_command('update_post_counters', '--rebuild', stdout=StringIO())
+    assert_counts(published_category, user, 1, 1)
+
+
+def test_post_save_leaves_checkpoint_alone(mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True,
+                       pub_date=timezone.now() - timedelta(days=1))
+    post.is_published = False
+    with CaptureQueriesContext(connection) as queries:
+        post.save()
+    assert not any('blog_checkpoint' in query['sql']
+                   and query['sql'].startswith('UPDATE')
+                   for query in queries.captured_queries), (
+        'Убедитесь, что сохранение поста не сдвигает контрольную точку.'
+    )
+    assert_counts(published_category, user, 0, 0)
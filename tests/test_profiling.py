@@ -0,0 +1,74 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.templatetags import blog_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.BLOG_PROFILING_DIR = tmp_path
+    yield tmp_path
+    call_command('profiling', 'off', stdout=StringIO())
+
+
+@pytest.fixture
+def slow_cards(monkeypatch):
+    card_version = blog_cache.card_version
+
+    def slow_card_version(post):
+        time.sleep(0.03)
+        return card_version(post)
+
+    monkeypatch.setattr(blog_cache, 'card_version', slow_card_version)
+
+
+def profiling(*args):
+    out = StringIO()
+    call_command('profiling', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_profiling_is_off_by_default(
+        client, profile_dir, post_with_published_location):
+    assert 'выключено' in profiling('status')
+    client.get('/')
+    assert not list(profile_dir.glob('*.folded'))
+
+
+def test_slow_request_is_profiled(
+        client, profile_dir, slow_cards, post_with_published_location):
+    assert 'включено' in profiling('on', '--interval-ms', '1')
+    client.get('/')
+    folded, = profile_dir.glob('*blog-homepage.folded')
+    for line in folded.read_text().splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0
+    assert 'template:blog/homepage.html' in folded.read_text(), (
+        'Убедитесь, что в стеках подписаны шаблоны.'
+    )
+    assert 'test_profiling:slow_card_version' in folded.read_text()
+    report = folded.with_suffix('.txt').read_text()
+    assert 'blog.templatetags.blog_cache:post_card' in report
+
+
+def test_fast_requests_and_rotation(
+        client, profile_dir, slow_cards, post_with_published_location):
+    profiling('on', '--interval-ms', '1', '--threshold-ms', '10000')
+    client.get('/')
+    assert not list(profile_dir.glob('*.folded')), (
+        'Убедитесь, что запросы быстрее порога не сохраняются.'
+    )
+
+    profiling('on', '--interval-ms', '1', '--keep', '2')
+    for _ in range(3):
+        client.get('/')
+    assert len(list(profile_dir.glob('*.folded'))) == 2
+
+    profiling('off')
+    client.get('/')
+    assert len(list(profile_dir.glob('*.folded'))) == 2
@@ -0,0 +1,90 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import scheduling
+from blog.cache import POST_SCOPE
+from blog.models import PostCounter
+from jobs.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def schedule_post(mixer, user, published_category):
+    def schedule_post(delay):
+        return mixer.blend('blog.Post', author=user,
+                           category=published_category, is_published=True,
+                           pub_date=timezone.now() + delay)
+    return schedule_post
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scheduling, 'invalidate',
+                        lambda *scopes: calls.append(set(scopes)))
+    return calls
+
+
+def queued_runs():
+    return list(Job.objects.filter(
+        task=scheduling.TASK
+    ).values_list('run_after', flat=True))
+
+
+def test_future_post_queues_one_run(schedule_post):
+    later = schedule_post(timedelta(hours=2))
+    assert queued_runs() == [later.pub_date]
+    schedule_post(timedelta(hours=3))
+    assert queued_runs() == [later.pub_date], (
+        'Убедитесь, что при уже запланированном раннем запуске новая '
+        'задача не ставится.'
+    )
+    sooner = schedule_post(timedelta(hours=1))
+    assert sorted(queued_runs()) == [sooner.pub_date, later.pub_date]
+
+
+def test_due_posts_are_published_once(
+        schedule_post, invalidated, user, django_capture_on_commit_callbacks):
+    post = schedule_post(timedelta(hours=1))
+    after = post.pub_date + timedelta(seconds=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert scheduling.publish_due(after) == 1
+        assert scheduling.publish_due(after) == 0
+    assert len(invalidated) == 1
+    assert POST_SCOPE.format(post_id=post.pk) in invalidated[0]
+    assert PostCounter.objects.get(
+        scope=PostCounter.AUTHOR, key=user.pk
+    ).published == 1
+
+
+def test_backlog_is_published_in_batches(
+        schedule_post, invalidated, django_capture_on_commit_callbacks):
+    posts = [schedule_post(timedelta(minutes=minutes))
+             for minutes in range(1, 6)]
+    after = timezone.now() + timedelta(hours=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert scheduling.publish_due(after, batch_size=2) == len(posts)
+    assert len(invalidated) == 3
+    published = [
+        post.pk for post in posts for scopes in invalidated
+        if POST_SCOPE.format(post_id=post.pk) in scopes
+    ]
+    assert published == [post.pk for post in posts]
+    assert scheduling.checkpoint() == after
+
+
+def test_command_publishes_and_queues_next(schedule_post, monkeypatch):
+    due = schedule_post(timedelta(hours=1))
+    upcoming = schedule_post(timedelta(hours=5))
+    Job.objects.all().delete()
+    monkeypatch.setattr(scheduling.timezone, 'now',
+                        lambda: due.pub_date + timedelta(minutes=1))
+    out = StringIO()
+    call_command('publish_scheduled', stdout=out)
+    assert 'Выпущено постов: 1.' in out.getvalue()
+    assert queued_runs() == [upcoming.pub_date]
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Search is backed by SQLite FTS5.'
+    ),
+]
+
+
+def _found_ids(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response, [post.id for post in response.context['page_obj']]
+
+
+def test_search_follows_publication_rules(
+        client, mixer, user, published_category):
+    visible = mixer.blend(
+        'blog.Post', title='Котики на крыше', text='Много котиков',
+        author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        'blog.Post', title='Котики в подвале', text='Скрытый пост',
+        author=user, category=published_category, is_published=False,
+    )
+    mixer.blend(
+        'blog.Post', title='Котики из будущего', text='Отложенный пост',
+        author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    response, found = _found_ids(client, 'котик')
+    assert found == [visible.id], (
+        'Убедитесь, что поиск показывает только опубликованные посты.'
+    )
+    assert '<mark>' in response.content.decode('utf-8')
+
+
+def test_search_index_follows_edits(client, post_with_published_location):
+    post = post_with_published_location
+    post.title = 'Уникальноеслово'
+    post.save()
+    assert _found_ids(client, 'уникальноеслово')[1] == [post.id]
+    post.delete()
+    assert _found_ids(client, 'уникальноеслово')[1] == []
+
+
+def test_search_is_keyset_paginated(
+        client, mixer, user, published_category):
+    posts = mixer.cycle(15).blend(
+        'blog.Post', title='Пагинация поиска', text='Текст',
+        author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response, first = _found_ids(client, 'пагинация')
+    cursor = response.context['page_obj'].next_cursor
+    _, second = _found_ids(client, 'пагинация', after=cursor)
+    assert sorted(first + second) == sorted(post.id for post in posts)
+
+
+def test_search_escapes_markup(client, mixer, user, published_category):
+    mixer.blend(
+        'blog.Post', title='Опасный', text='<script>alert(1)</script> текст',
+        author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    content = client.get('/search/', {'q': 'alert'}).content.decode('utf-8')
+    assert '<script>alert' not in content
+
+
+def test_rebuild_search_index(client, post_with_published_location):
+    post = post_with_published_location
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('delete-all')"
+        )
+    assert _found_ids(client, post.title.split()[0])[1] == []
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert post.id in _found_ids(client, post.title.split()[0])[1]
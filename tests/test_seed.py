@@ -0,0 +1,70 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, F
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category, Commentary, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(**options):
+    call_command('seed_blog', users=5, posts=40, comments=200,
+                 categories=3, locations=4, stdout=StringIO(), **options)
+
+
+def test_seed_creates_requested_rows():
+    seed()
+    assert Post.objects.count() == 40
+    assert Commentary.objects.count() == 200
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    mismatched = Post.objects.annotate(
+        actual=Count('commentaries')
+    ).exclude(comment_count=F('actual'))
+    assert not mismatched.exists(), (
+        'Убедитесь, что seed_blog заполняет Post.comment_count.'
+    )
+
+
+def test_seed_is_skewed_and_deterministic():
+    seed()
+    counts = list(Post.objects.order_by('id').values_list(
+        'title', 'comment_count'
+    ))
+    hottest = max(count for _, count in counts)
+    assert hottest > 200 / 40 * 3, (
+        'Убедитесь, что комментарии распределены неравномерно.'
+    )
+    for model in (Commentary, Post, Category, Location):
+        model.objects.all().delete()
+    get_user_model().objects.filter(username__startswith='seed_').delete()
+    seed()
+    assert list(Post.objects.order_by('id').values_list(
+        'title', 'comment_count'
+    )) == counts, 'Убедитесь, что seed_blog детерминирован по --seed.'
+
+
+def test_rerun_requires_clear(mixer, post_with_published_location):
+    seed()
+    kept = post_with_published_location
+    mixer.blend('blog.Commentary', post=kept, author=get_user_model(
+    ).objects.filter(username__startswith='seed_').first())
+    with pytest.raises(CommandError, match='--clear'):
+        seed()
+    with CaptureQueriesContext(connection) as queries:
+        seed(clear=True)
+    assert Post.objects.count() == 41, (
+        'Убедитесь, что --clear удаляет ранее засеянные данные.'
+    )
+    assert Category.objects.count() == 4
+    kept.refresh_from_db()
+    assert kept.comment_count == kept.commentaries.count() == 0
+    assert len(queries) < 300, (
+        'Убедитесь, что --clear удаляет строки пакетно, без сигналов.'
+    )
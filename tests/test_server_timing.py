@@ -0,0 +1,53 @@
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _metrics(header):
+    return dict(re.findall(r'(\w+);dur=([\d.]+)', header))
+
+
+def test_blog_views_report_server_timing(
+        client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/')
+    header = response['Server-Timing']
+    metrics = _metrics(header)
+    assert set(metrics) == {'db', 'tpl', 'total'}, (
+        'Убедитесь, что заголовок Server-Timing содержит время БД, '
+        'шаблонов и всего запроса.'
+    )
+    assert f'"{len(queries.captured_queries)} queries"' in header
+    assert float(metrics['tpl']) > 0
+    assert float(metrics['total']) >= float(metrics['tpl'])
+
+
+def test_pages_views_report_server_timing(client):
+    response = client.get('/pages/about/')
+    assert float(_metrics(response['Server-Timing'])['tpl']) > 0, (
+        'Убедитесь, что время отрисовки TemplateResponse учитывается.'
+    )
+
+
+def test_other_apps_are_not_timed(admin_client):
+    response = admin_client.get('/admin/')
+    assert response.status_code == 200
+    assert not response.has_header('Server-Timing')
+
+
+def test_timing_is_logged(client, caplog, post_with_published_location):
+    logger = logging.getLogger('blog.timing')
+    logger.addHandler(caplog.handler)
+    try:
+        client.get(f'/posts/{post_with_published_location.id}/')
+    finally:
+        logger.removeHandler(caplog.handler)
+    record, = [r for r in caplog.records if r.name == 'blog.timing']
+    assert record.timing['view'] == 'blog:post_detail'
+    assert record.timing['status'] == 200
+    assert 'db_queries=' in record.getMessage()
@@ -0,0 +1,141 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import scheduling
+from blog.management.commands import import_blog
+from blog.models import Category, Commentary, Location, Post
+from jobs.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+def export(**options):
+    out, err = StringIO(), StringIO()
+    call_command('export_blog', stdout=out, stderr=err, **options)
+    return out.getvalue()
+
+
+def test_export_writes_typed_jsonl(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Commentary', post=post)
+    records = [json.loads(line) for line in export().splitlines()]
+    types = [record['type'] for record in records]
+    assert types == ['category', 'location', 'post', 'comment', 'comment'], (
+        'Убедитесь, что выгрузка идёт в порядке: категории, места, '
+        'публикации, комментарии.'
+    )
+    post_record = records[2]
+    assert post_record['author'] == post.author.username
+    assert post_record['category'] == post.category.slug
+    assert post_record['image']['content'], (
+        'Убедитесь, что файлы фото встраиваются в выгрузку.'
+    )
+
+
+def test_round_trip(tmp_path, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Commentary', post=post)
+    dump = tmp_path / 'blog.jsonl'
+    call_command('export_blog', str(dump), stderr=StringIO())
+    expected_comments = [
+        (comment.id, comment.text, comment.created_at)
+        for comment in comments
+    ]
+    username = post.author.username
+
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    post.author.delete()
+
+    out = StringIO()
+    call_command('import_blog', str(dump), '--batch-size', '2',
+                 '--chunk-size', '3', stdout=out)
+    assert 'строк/с' in out.getvalue(), (
+        'Убедитесь, что import_blog сообщает скорость загрузки.'
+    )
+    imported = Post.objects.select_related('author', 'category').get()
+    assert imported.id == post.id
+    assert imported.author.username == username
+    assert imported.category.slug == post.category.slug
+    assert imported.location.name == post.location.name
+    assert imported.created_at == post.created_at
+    assert imported.comment_count == 3
+    assert imported.image
+    assert list(Commentary.objects.order_by('id').values_list(
+        'id', 'text', 'created_at')) == expected_comments
+    assert Job.objects.filter(
+        task='blog.build_image_variants', payload={'post_id': post.id}
+    ).exists()
+
+
+def test_import_rejects_unknown_category():
+    source = StringIO(json.dumps({
+        'type': 'post', 'id': 1, 'title': 'x', 'text': 'x',
+        'pub_date': '2024-01-01T00:00:00Z', 'author': 'someone',
+        'category': 'missing', 'location': None,
+    }) + '\n')
+    with pytest.raises(Exception, match='missing'):
+        call_command('import_blog', stdin=source, stdout=StringIO())
+    assert not Post.objects.exists()
+
+
+def test_import_keeps_same_named_locations_apart(
+        tmp_path, mixer, user, published_category):
+    first, second = mixer.cycle(2).blend('blog.Location', name='Москва',
+                                         is_published=True)
+    posts = {
+        mixer.blend('blog.Post', author=user, category=published_category,
+                    location=location, is_published=True,
+                    pub_date=timezone.now() + timedelta(days=1)).id:
+        location.id
+        for location in (first, second)
+    }
+    dump = tmp_path / 'blog.jsonl'
+    call_command('export_blog', str(dump), stderr=StringIO())
+    Post.objects.all().delete()
+    Location.objects.filter(id=second.id).delete()
+    Job.objects.all().delete()
+
+    call_command('import_blog', str(dump), stdout=StringIO())
+    assert dict(Post.objects.values_list('id', 'location_id')) == posts, (
+        'Убедитесь, что места с одинаковыми названиями не склеиваются.'
+    )
+    assert Job.objects.filter(task=scheduling.TASK).exists(), (
+        'Убедитесь, что после загрузки запланирован выпуск отложенных постов.'
+    )
+
+    Location.objects.filter(id=second.id).update(name='Казань')
+    Post.objects.all().delete()
+    with pytest.raises(Exception, match=str(second.id)):
+        call_command('import_blog', str(dump), stdout=StringIO())
+
+
+def test_import_lookups_stay_per_chunk(tmp_path, mixer,
+                                       published_category, monkeypatch):
+    for author in mixer.cycle(5).blend('auth.User'):
+        mixer.blend('blog.Post', author=author, category=published_category,
+                    location=None)
+    dump = tmp_path / 'blog.jsonl'
+    call_command('export_blog', str(dump), stderr=StringIO())
+    Post.objects.all().delete()
+    sizes = []
+    load = import_blog.Lookup.load
+
+    def tracking_load(lookup, keys):
+        missing = load(lookup, keys)
+        sizes.append(len(lookup.ids))
+        return missing
+
+    monkeypatch.setattr(import_blog.Lookup, 'load', tracking_load)
+    call_command('import_blog', str(dump), '--chunk-size', '2',
+                 stdout=StringIO())
+    assert Post.objects.count() == 5
+    assert max(sizes) <= 2, (
+        'Убедитесь, что карты id не растут на всю загрузку.'
+    )
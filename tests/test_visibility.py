@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from blog import visibility
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def visible_kwargs(user, published_category):
+    return {
+        'author': user,
+        'category': published_category,
+        'is_published': True,
+        'pub_date': timezone.now() - timedelta(days=1),
+    }
+
+
+def test_visible_to_applies_publication_rules(
+        mixer, user, another_user, visible_kwargs):
+    public = mixer.blend('blog.Post', **visible_kwargs)
+    draft = mixer.blend('blog.Post', **{**visible_kwargs,
+                                        'is_published': False})
+    scheduled = mixer.blend('blog.Post', **{
+        **visible_kwargs, 'pub_date': timezone.now() + timedelta(days=1)
+    })
+    everyone = set(Post.objects.visible_to(AnonymousUser()))
+    assert everyone == set(Post.objects.visible_to()) == {public}
+    assert set(Post.objects.visible_to(another_user)) == {public}
+    assert set(Post.objects.visible_to(user)) == {public, draft, scheduled}
+
+
+def test_location_visibility_is_annotated(mixer, visible_kwargs):
+    hidden = mixer.blend('blog.Location', is_published=False)
+    shown = mixer.blend('blog.Location', is_published=True)
+    posts = {
+        location: mixer.blend('blog.Post', location=location,
+                              **visible_kwargs).pk
+        for location in (hidden, shown, None)
+    }
+    flags = dict(Post.objects.visible_to().values_list(
+        'pk', 'location_visible'
+    ))
+    assert flags == {posts[hidden]: False, posts[shown]: True,
+                     posts[None]: False}, (
+        'Убедитесь, что посты без местоположения не теряются, а '
+        'снятое с публикации местоположение помечено как скрытое.'
+    )
+
+
+def test_hidden_location_is_not_rendered(client, mixer, visible_kwargs):
+    location = mixer.blend('blog.Location', is_published=False,
+                           name='Секретная база')
+    post = mixer.blend('blog.Post', location=location, **visible_kwargs)
+    for url in ('/', f'/posts/{post.pk}/'):
+        content = client.get(url).content.decode()
+        assert 'Секретная база' not in content, url
+    assert client.get(f'/api/v1/posts/{post.pk}/').json()['location'] is None
+
+
+def flags(*posts):
+    return [Post.objects.get(pk=post.pk).is_visible for post in posts]
+
+
+def test_flag_follows_post_and_category(
+        mixer, visible_kwargs, published_category, another_category):
+    post = mixer.blend('blog.Post', **visible_kwargs)
+    draft = mixer.blend('blog.Post', **{**visible_kwargs,
+                                        'is_published': False})
+    assert flags(post, draft) == [True, False]
+
+    published_category.is_published = False
+    published_category.save()
+    assert flags(post, draft) == [False, False], (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert flags(post, draft) == [True, False]
+
+    post.is_published = False
+    post.save(update_fields=['is_published'])
+    assert flags(post) == [False]
+    post.is_published = True
+    post.save()
+    published_category.delete()
+    assert flags(post) == [False]
+    assert visibility.drift() == {True: set(), False: set()}
+
+
+def test_check_command_repairs_drift(mixer, visible_kwargs):
+    shown, hidden = mixer.cycle(2).blend('blog.Post', **visible_kwargs)
+    Post.objects.filter(pk=shown.pk).update(is_published=False)
+    Post.objects.filter(pk=hidden.pk).update(is_visible=False)
+    with pytest.raises(CommandError):
+        call_command('check_post_visibility', stdout=StringIO())
+    call_command('check_post_visibility', '--repair', stdout=StringIO())
+    assert flags(shown, hidden) == [False, True]
+    call_command('check_post_visibility', stdout=StringIO())
+
+
+def test_public_feed_filters_one_table():
+    sql = str(Post.objects.published().query).split('WHERE')[1]
+    assert 'blog_category' not in sql